@@ -1,119 +1,36 @@
+import asyncio
+import json
 import os
 import streamlit as st
 from strands import Agent
-from strands.models import BedrockModel
-from strands_tools import use_llm, memory, mem0_memory
-
-# Import the specialized assistants
-from strands_multi_agent_example.computer_science_assistant import computer_science_assistant
-from strands_multi_agent_example.english_assistant import english_assistant
-from strands_multi_agent_example.language_assistant import language_assistant
-from strands_multi_agent_example.math_assistant import math_assistant
-from strands_multi_agent_example.no_expertise import general_assistant
-
-# Define the teacher's assistant system prompt
-TEACHER_SYSTEM_PROMPT = """
-You are TeachAssist, a sophisticated educational orchestrator designed to coordinate educational support across multiple subjects. Your role is to:
-
-1. Analyze incoming student queries and determine the most appropriate specialized agent to handle them:
-   - Math Agent: For mathematical calculations, problems, and concepts
-   - English Agent: For writing, grammar, literature, and composition
-   - Language Agent: For translation and language-related queries
-   - Computer Science Agent: For programming, algorithms, data structures, and code execution
-   - General Assistant: For all other topics outside these specialized domains
-
-2. Key Responsibilities:
-   - Accurately classify student queries by subject area
-   - Route requests to the appropriate specialized agent
-   - Maintain context and coordinate multi-step problems
-   - Ensure cohesive responses when multiple agents are needed
-
-3. Decision Protocol:
-   - If query involves calculations/numbers → Math Agent
-   - If query involves writing/literature/grammar → English Agent
-   - If query involves translation → Language Agent
-   - If query involves programming/coding/algorithms/computer science → Computer Science Agent
-   - If query is outside these specialized areas → General Assistant
-   - For complex queries, coordinate multiple agents as needed
-
-Always confirm your understanding before routing to ensure accurate assistance.
-"""
-
-# System prompt to determine action
-ACTION_SYSTEM_PROMPT = """
-You are an assistant that determines whether a query should be handled by:
-1. A teacher agent for educational questions (math, language, English, computer science, general knowledge)
-2. A knowledge base agent for personal information storage and retrieval
-
-Reply with EXACTLY ONE WORD - either "teacher" or "knowledgebase".
-DO NOT include any explanations or other text.
-
-Examples:
-- "What is the capital of France?" -> "teacher"
-- "How do I solve this equation: 2x + 5 = 15?" -> "teacher"
-- "Translate 'hello' to Spanish" -> "teacher"
-- "Remember that my birthday is July 4" -> "knowledgebase"
-- "What's my birthday?" -> "knowledgebase"
-- "My favorite color is blue" -> "knowledgebase"
-- "What is my favorite color?" -> "knowledgebase"
-
-Only respond with "teacher" or "knowledgebase" - no explanation, prefix, or any other text.
-"""
-
-# System prompt for knowledge base actions
-KB_ACTION_SYSTEM_PROMPT = """
-You are a knowledge base assistant focusing ONLY on classifying user queries.
-Your task is to determine whether a user query requires STORING information to a knowledge base
-or RETRIEVING information from a knowledge base.
-
-Reply with EXACTLY ONE WORD - either "store" or "retrieve".
-DO NOT include any explanations or other text.
-
-Examples:
-- "Remember that my birthday is July 4" -> "store"
-- "What's my birthday?" -> "retrieve"
-- "The capital of France is Paris" -> "store"
-- "What is the capital of France?" -> "retrieve"
-- "My name is John" -> "store" 
-- "Who am I?" -> "retrieve"
-- "I live in Seattle" -> "store"
-- "Where do I live?" -> "retrieve"
-
-Only respond with "store" or "retrieve" - no explanation, prefix, or any other text.
-"""
-
-# System prompt for generating answers from retrieved information
-ANSWER_SYSTEM_PROMPT = """
-You are a helpful knowledge assistant that provides clear, concise answers 
-based on information retrieved from a knowledge base.
-
-The information from the knowledge base contains document IDs, titles, 
-content previews and relevance scores. Focus on the actual content and 
-ignore the metadata.
-
-Your responses should:
-1. Be direct and to the point
-2. Not mention the source of information (like document IDs or scores)
-3. Not include any metadata or technical details
-4. Be conversational but brief
-5. Acknowledge when information is conflicting or missing
-6. Begin the response with \n
-
-When analyzing the knowledge base results:
-- Higher scores (closer to 1.0) indicate more relevant results
-- Look for patterns across multiple results
-- Prioritize information from results with higher scores
-- Ignore any JSON formatting or technical elements in the content
-
-Example response for conflicting information:
-"Based on my records, I have both July 4 and August 8 listed as your birthday. Could you clarify which date is correct?"
-
-Example response for clear information:
-"Your birthday is on July 4."
+from strands_tools import use_llm, mem0_memory
+
+from query_router import route_kb_action, wants_memory_list
+from teachassist import (
+    CLASSIFIER_MODEL_ID,
+    KB_MAX_RESULTS,
+    KB_PROMPT_TEMPLATE,
+    TEACHER_TOOL_LABELS,
+    answer_query,
+    cached_retrieve,
+    get_bedrock_model,
+    get_classifier_model,
+    get_kb_agent,
+    get_store_executor,
+    get_teacher_agent,
+    init_session_state,
+    render_history,
+    render_new_messages,
+    report_finished_stores,
+    session_resource,
+    stream_response,
+    synthesize_answer,
+    tool_text,
+    warm_up_models,
+)
 
-Example response for missing information:
-"I don't have any information about your birthday stored."
-"""
+# User the OpenSearch-backed memories are stored under
+MEMORY_USER_ID = "streamlit_user"
 
 # Set up the page
 st.set_page_config(page_title="TeachAssist - Educational Assistant", layout="wide")
@@ -154,78 +71,25 @@ selected_model = st.sidebar.selectbox(
     index=0
 )
 
+selected_classifier_model = st.sidebar.selectbox(
+    "Classifier Model",
+    options=model_options,
+    index=model_options.index(CLASSIFIER_MODEL_ID)
+)
+
 # Teacher agent toggles
 st.sidebar.header("Teacher Agent Tools")
-use_math = st.sidebar.checkbox("Math Assistant", value=True)
-use_language = st.sidebar.checkbox("Language Assistant", value=True)
-use_english = st.sidebar.checkbox("English Assistant", value=True)
-use_cs = st.sidebar.checkbox("Computer Science Assistant", value=True)
-use_general = st.sidebar.checkbox("General Assistant", value=True)
-
-# Initialize session state for conversation history
-if "messages" not in st.session_state:
-    st.session_state.messages = []
-
-# Display conversation history
-for message in st.session_state.messages:
-    with st.chat_message(message["role"]):
-        st.markdown(message["content"])
-
-# Initialize the teacher agent
-def get_teacher_agent():
-    # Specify the Bedrock ModelID
-    bedrock_model = BedrockModel(
-        model_id=selected_model,
-        temperature=0.3,
-    )
-    
-    # Select tools based on user toggles
-    tools = []
-    if use_math:
-        tools.append(math_assistant)
-    if use_language:
-        tools.append(language_assistant)
-    if use_english:
-        tools.append(english_assistant)
-    if use_cs:
-        tools.append(computer_science_assistant)
-    if use_general:
-        tools.append(general_assistant)
-    
-    # If no tools selected, default to general assistant
-    if not tools:
-        tools = [general_assistant]
-    
-    # Create the teacher agent with specialized tools
-    return Agent(
-        model=bedrock_model,
-        system_prompt=TEACHER_SYSTEM_PROMPT,
-        callback_handler=None,
-        tools=tools,
-    )
+enabled_tools = frozenset(
+    label for label in TEACHER_TOOL_LABELS if st.sidebar.checkbox(label, value=True)
+)
 
-# Initialize the knowledge base agent
-def get_kb_agent():
-    # Specify the Bedrock ModelID
-    bedrock_model = BedrockModel(
-        model_id=selected_model,
-        temperature=0.3,
-    )
-    
-    # Create the knowledge base agent with memory tools
-    return Agent(
-        model=bedrock_model,
-        tools=[memory, use_llm],
-    )
+# Initialize session state and display conversation history
+init_session_state()
+render_history()
 
-# Initialize the memory agent with OpenSearch backend
-def get_memory_agent():
-    # Specify the Bedrock ModelID
-    bedrock_model = BedrockModel(
-        model_id=selected_model,
-        temperature=0.1,
-    )
-    
+# Initialize this session's memory agent with OpenSearch backend, rebuilt when the model changes
+@session_resource
+def get_memory_agent(model_id: str):
     # System prompt for the memory agent
     MEMORY_SYSTEM_PROMPT = """You are a personal assistant that maintains context by remembering user details.
 
@@ -245,146 +109,121 @@ def get_memory_agent():
     
     # Create the memory agent with mem0_memory tools
     return Agent(
-        model=bedrock_model,
+        model=get_bedrock_model(model_id, temperature=0.1),
         system_prompt=MEMORY_SYSTEM_PROMPT,
         tools=[mem0_memory, use_llm],
+        record_direct_tool_call=False,  # Keep direct mem0 calls out of its history
     )
 
-def determine_action(query):
-    """Determine if the query should be handled by the teacher agent or knowledge base agent."""
-    agent = get_kb_agent()
-    
-    result = agent.tool.use_llm(
-        prompt=f"Query: {query}",
-        system_prompt=ACTION_SYSTEM_PROMPT
+def store_in_memory(agent, query):
+    """Store the full query as a memory in the background."""
+    future = get_store_executor().submit(
+        agent.tool.mem0_memory, action="store", content=query, user_id=MEMORY_USER_ID
     )
+    st.session_state.pending_stores.append(future)
+    st.session_state.retrieve_cache.clear()
+    return "I've stored this information."
+
+def format_memories(result, max_results=None):
+    """Render a mem0 retrieve or list result as a compact list of memories, best scores first."""
+    text = tool_text(result)
+    try:
+        records = json.loads(text)
+    except ValueError:
+        # Not a structured listing - pass the text through unchanged
+        return text
+    if isinstance(records, dict):
+        records = records.get("results", [])
+    
+    records = [record for record in records if isinstance(record, dict) and record.get("memory")]
+    records.sort(key=lambda record: record.get("score") or 0, reverse=True)
+    return "\n".join(f"- {record['memory']}" for record in records[:max_results])
+
+async def run_memory_agent(query, placeholder):
+    """Process a user query with the memory agent using OpenSearch backend."""
+    agent = get_memory_agent(selected_model)
     
-    # Clean and extract the action
-    action_text = str(result).lower().strip()
-    
-    # Determine which agent to use
-    if "teacher" in action_text:
-        return "teacher"
-    else:
-        return "knowledgebase"
-
-def run_kb_agent(query):
-    """Process a user query with the knowledge base agent."""
-    agent = get_kb_agent()
+    # Route clear stores and retrievals without the memory agent's own tool-use loop
+    action = route_kb_action(query)
+    if action == "store":
+        return store_in_memory(agent, query)
+    if action is None:
+        # Ambiguous - let the memory agent decide, streaming the reply
+        return await stream_response(agent, query, placeholder, user_id=MEMORY_USER_ID)
     
-    # Determine the action - store or retrieve
-    result = agent.tool.use_llm(
-        prompt=f"Query: {query}",
-        system_prompt=KB_ACTION_SYSTEM_PROMPT
-    )
+    async def call_mem0(**kwargs):
+        return await asyncio.to_thread(agent.tool.mem0_memory, user_id=MEMORY_USER_ID, **kwargs)
     
-    # Clean and extract the action
-    action_text = str(result).lower().strip()
+    # Recent results for a repeated query are reused
+    async def list_memories():
+        return await cached_retrieve(("mem0-list",), lambda: call_mem0(action="list"))
     
-    # Default to retrieve if response isn't clear
-    if "store" in action_text:
-        # For store actions, store the full query
-        agent.tool.memory(action="store", content=query)
-        return "I've stored this information."
+    if wants_memory_list(query):
+        memories = format_memories(await list_memories())
     else:
-        # For retrieve actions, query the knowledge base with appropriate parameters
-        result = agent.tool.memory(
-            action="retrieve", 
-            query=query,
-            min_score=0.4,  # Set reasonable minimum score threshold
-            max_results=9   # Retrieve a good number of results
-        )
-        # Convert the result to a string to extract just the content text
-        result_str = str(result)
-        
-        # Generate a clear, conversational answer using the retrieved information
-        answer = agent.tool.use_llm(
-            prompt=f"User question: \"{query}\"\n\nInformation from knowledge base:\n{result_str}\n\nStart your answer with newline character and provide a helpful answer based on this information:",
-            system_prompt=ANSWER_SYSTEM_PROMPT
+        retrieved = await cached_retrieve(
+            ("mem0", query.strip().lower()),
+            lambda: call_mem0(action="retrieve", query=query),
         )
-        
-        return str(answer)
-
-def run_memory_agent(query):
-    """Process a user query with the memory agent using OpenSearch backend."""
-    agent = get_memory_agent()
-    USER_ID = "streamlit_user"
+        memories = format_memories(retrieved, KB_MAX_RESULTS)
+        if not memories:
+            # Nothing relevant retrieved - fall back to the full list
+            memories = format_memories(await list_memories())
     
-    # Process the query directly with the memory agent
-    response = agent(query, user_id=USER_ID)
-    
-    # Extract the response content
-    if isinstance(response, dict) and "message" in response and "content" in response["message"]:
-        content = response["message"]["content"][0]["text"]
-        return content
-    else:
-        return str(response)
+    kb_prompt = KB_PROMPT_TEMPLATE.format(query=query, records=memories)
+    return await synthesize_answer(agent.model, kb_prompt, placeholder)
 
-# Get user input
-query = st.chat_input("Ask your question here...")
+# Open the Bedrock connections before the first query arrives
+warm_up_models(selected_model, selected_classifier_model)
 
-if query:
-    # Add user message to chat history
-    st.session_state.messages.append({"role": "user", "content": query})
+# Handle the chat in a fragment so sending a message reruns only this part of the page
+@st.fragment
+def chat():
+    # Surface failures from earlier background writes
+    report_finished_stores()
     
-    # Display user message
-    with st.chat_message("user"):
-        st.markdown(query)
+    # Display messages added by earlier runs of this fragment
+    render_new_messages()
     
-    # Display assistant response
-    with st.chat_message("assistant"):
-        message_placeholder = st.empty()
+    # Get user input
+    query = st.chat_input("Ask your question here...")
+
+    if query:
+        # Add user message to chat history
+        st.session_state.messages.append({"role": "user", "content": query})
+        
+        # Display user message
+        with st.chat_message("user"):
+            st.markdown(query)
         
-        try:
-            # Check if we're using the memory agent or the regular flow
-            if selected_agent == "Memory Agent (OpenSearch)" and has_opensearch:
-                with st.spinner("Processing with Memory Agent..."):
-                    content = run_memory_agent(query)
-            else:
-                # Determine which agent should handle the query
-                with st.spinner("Analyzing query..."):
-                    action = determine_action(query)
+        # Display assistant response
+        with st.chat_message("assistant"):
+            message_placeholder = st.empty()
+            
+            try:
+                # Check if we're using the memory agent or the regular flow
+                if selected_agent == "Memory Agent (OpenSearch)" and has_opensearch:
+                    with st.spinner("Processing with Memory Agent..."):
+                        content = asyncio.run(run_memory_agent(query, message_placeholder))
+                else:
+                    # Route the query and stream the answer from the selected agent
+                    with st.spinner("Thinking..."):
+                        content = asyncio.run(answer_query(
+                            query,
+                            message_placeholder,
+                            get_teacher_agent(selected_model, enabled_tools),
+                            get_kb_agent(selected_model),
+                            get_classifier_model(selected_classifier_model),
+                        ))
                 
-                content = ""
+                # Display the response
+                message_placeholder.markdown(content)
                 
-                # Process with the appropriate agent
-                if action == "teacher":
-                    with st.spinner("Processing with Teacher Agent..."):
-                        teacher_agent = get_teacher_agent()
-                        content = teacher_agent(query)
-                else:
-                    with st.spinner("Processing with Knowledge Base Agent..."):
-                        content = run_kb_agent(query)
-            
-            # Display the response
-            message_placeholder.markdown(content)
-            
-            # Add assistant response to chat history
-            st.session_state.messages.append({"role": "assistant", "content": content})
-            
-        except Exception as e:
-            message_placeholder.error(f"Error: {str(e)}")
-            st.session_state.messages.append({"role": "assistant", "content": f"Error: {str(e)}"})
-            if action == "teacher":
-                # Get the teacher agent
-                teacher_agent = get_teacher_agent()
+                # Add assistant response to chat history
+                st.session_state.messages.append({"role": "assistant", "content": content})
                 
-                # Process the query with the teacher agent
-                with st.spinner("Consulting educational specialists..."):
-                    response = teacher_agent(query)
-                    content = str(response)
-            else:
-                # Process the query with the knowledge base agent
-                with st.spinner("Accessing knowledge base..."):
-                    content = run_kb_agent(query)
-            
-            # Display the response
-            message_placeholder.markdown(content)
-            
-            # Add assistant response to chat history
-            st.session_state.messages.append({"role": "assistant", "content": content})
-            
-        except Exception as e:
-            error_message = f"An error occurred: {str(e)}"
-            message_placeholder.markdown(error_message)
-            st.session_state.messages.append({"role": "assistant", "content": error_message})
+            except Exception as e:
+                message_placeholder.error(f"Error: {str(e)}")
+                st.session_state.messages.append({"role": "assistant", "content": f"Error: {str(e)}"})
+
+chat()
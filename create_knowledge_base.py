@@ -1,14 +1,21 @@
 import boto3
+import io
 import json
 import logging
 import os
 import re
 import requests
+import shutil
+import threading
 import time
 import uuid
 import zipfile
 
 
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from knowledge_base import BedrockKnowledgeBase
 from tqdm import tqdm
 from urllib.parse import urlparse
@@ -17,60 +24,199 @@ from urllib.parse import urlparse
 logging.basicConfig(format='[%(asctime)s] p%(process)s {%(filename)s:%(lineno)d} %(levelname)s - %(message)s', level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-session = boto3.session.Session()
-region = os.getenv('AWS_REGION', session.region_name)
+# One session for all clients, so the AWS config files are only parsed once
+session = boto3.session.Session(region_name=os.getenv('AWS_REGION'))
+region = session.region_name
 if region:
     print(f'Region: {region}')
 else:
     print("Cannot determine AWS region from `AWS_REGION` environment variable or from `boto3.session.Session().region_name`")
     raise
 
-s3_client = boto3.client('s3', region)
-bedrock_agent_client = boto3.client('bedrock-agent', region)
-bedrock_agent_runtime_client = boto3.client('bedrock-agent-runtime', region)
+# Shared client config with a connection pool large enough for the concurrent uploads and ingest calls
+boto_config = Config(
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    tcp_keepalive=True,
+    max_pool_connections=32
+)
+s3_client = session.client('s3', config=boto_config)
+bedrock_agent_client = session.client('bedrock-agent', config=boto_config)
+bedrock_agent_runtime_client = session.client('bedrock-agent-runtime', config=boto_config)
 
+# Runs of whitespace and dashes collapse to a single dash in cleaned filenames
+CLEAN_FILENAME_RE = re.compile(r'[\s-]+')
 
-def download_file(url):
-    destination = os.path.basename(urlparse(url).path)
-    try:
-        response = requests.get(url, stream=True)
+# Read the download in 1 MiB chunks to keep per-chunk Python and write overhead low
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# Servers that accept range requests are downloaded in 8 MiB ranges over several connections
+DOWNLOAD_RANGE_SIZE = 8 << 20
+DOWNLOAD_WORKERS = 4
+
+# Connect and read timeouts for download requests, and attempts per range before giving up
+DOWNLOAD_TIMEOUT = (10, 60)
+DOWNLOAD_RETRIES = 3
+
+# Buffer size used when copying members out of the zip archive
+ZIP_BUFFER_SIZE = 1 << 20
+
+# Number of files uploaded to S3 at the same time
+UPLOAD_WORKERS = 16
+
+# Files over 8 MiB upload as 8 MiB multipart parts; per-file concurrency stays low
+# because UPLOAD_WORKERS files are already in flight
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 << 20,
+    multipart_chunksize=8 << 20,
+    max_concurrency=4,
+    use_threads=True
+)
+
+# OS metadata files that are never uploaded, along with macOS '._' resource forks
+SKIPPED_FILENAMES = frozenset({'.DS_Store', 'Thumbs.db'})
+
+# Documents per ingest call, and the number of ingest calls in flight
+INGEST_BATCH_SIZE = 25
+INGEST_WORKERS = 4
+
+# Bucket and knowledge base IDs saved between runs; delete it to rediscover them
+KB_CONFIG_FILE = '.kb_config.json'
+
+
+class MemoryFile(io.RawIOBase):
+    # Seekable read-only file over a bytes-like object; unlike io.BytesIO it never copies a bytearray
+    def __init__(self, data):
+        self.view = memoryview(data)
+        self.pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = { io.SEEK_SET: 0, io.SEEK_CUR: self.pos, io.SEEK_END: len(self.view) }[whence]
+        self.pos = max(base + offset, 0)
+        return self.pos
+
+    def readinto(self, buffer):
+        chunk = self.view[self.pos:self.pos + len(buffer)]
+        buffer[:len(chunk)] = chunk
+        self.pos += len(chunk)
+        return len(chunk)
+
+def download_ranges(url, size, progress_bar):
+    # Fetch fixed-size byte ranges in parallel and write each one at its offset in a shared buffer,
+    # which is returned as is so the archive is only held in memory once
+    data = bytearray(size)
+    view = memoryview(data)
+
+    def fetch(start):
+        end = min(start + DOWNLOAD_RANGE_SIZE, size) - 1
+        for attempt in range(DOWNLOAD_RETRIES):
+            offset = start
+            try:
+                with requests.get(url, headers={'Range': f'bytes={start}-{end}'}, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+                    response.raise_for_status()
+                    if response.status_code != 206:
+                        raise ValueError(f"Server ignored the range request for bytes {start}-{end}")
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        view[offset:offset + len(chunk)] = chunk
+                        offset += len(chunk)
+                        progress_bar.update(len(chunk))
+                return
+            except requests.RequestException as e:
+                # Take the partial range back off the progress bar and fetch it again
+                progress_bar.update(start - offset)
+                if attempt == DOWNLOAD_RETRIES - 1:
+                    raise
+                print(f"Retrying bytes {start}-{end} after error: {e}")
+
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+        list(executor.map(fetch, range(0, size, DOWNLOAD_RANGE_SIZE)))
+    return data
+
+def download_stream(url, name):
+    # Stream the whole response through a single connection
+    with requests.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
         response.raise_for_status()
         file_size = int(response.headers.get('content-length', 0))
+        response.raw.decode_content = True
 
-        with open(destination, 'wb') as file, tqdm(
-            desc=destination,
+        buffer = io.BytesIO()
+        with tqdm.wrapattr(
+            response.raw,
+            'read',
+            desc=name,
             total=file_size,
             unit='B',
             unit_scale=True,
             unit_divisor=1024,
-        ) as progress_bar:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    file.write(chunk)
-                    progress_bar.update(len(chunk))
-        return True
+        ) as raw:
+            shutil.copyfileobj(raw, buffer, length=DOWNLOAD_CHUNK_SIZE)
+    return buffer.getvalue()
+
+def download_and_extract(url, destination='.'):
+    # Download the archive into memory and extract it from there, so it is never written to disk
+    name = os.path.basename(urlparse(url).path)
+    try:
+        head = requests.head(url, allow_redirects=True, timeout=DOWNLOAD_TIMEOUT)
+        head.raise_for_status()
+        size = int(head.headers.get('content-length', 0))
+        if head.headers.get('accept-ranges') == 'bytes' and size > DOWNLOAD_RANGE_SIZE:
+            with tqdm(desc=name, total=size, unit='B', unit_scale=True, unit_divisor=1024) as progress_bar:
+                zip_data = download_ranges(url, size, progress_bar)
+        else:
+            zip_data = download_stream(url, name)
     except Exception as e:
         print(f"Error downloading file: {e}")
         return False
+    return extract_zip_file(zip_data, name, destination)
 
-def extract_zip_file(zip_path):
+def extract_zip_file(zip_data, name, destination='.'):
     try:
-        n_files = 0
-        with zipfile.ZipFile(zip_path, 'r') as f:
-            file_list = f.namelist()
-            print(f"Extracting files from {zip_path}")
-            for file in tqdm(file_list, desc="Extracting"):
-                if file.startswith('__') or '.DS_Store' in file:
-                    print(f'Skipping file: {file}')
-                    continue
-                clean_filename = re.sub(r'[\s-]+', '-', file).lower()
-                f.extract(file, '.')
-                os.rename(file, clean_filename)
-                n_files += 1
-        print(f"Successfully extracted {n_files} files")
+        members = []
+        with zipfile.ZipFile(MemoryFile(zip_data), 'r') as f:
+            infos = f.infolist()
+        print(f"Extracting files from {name}")
+        root = os.path.realpath(destination)
+        for info in infos:
+            if info.filename.startswith('__') or '.DS_Store' in info.filename:
+                print(f'Skipping file: {info.filename}')
+                continue
+            clean_filename = os.path.join(destination, CLEAN_FILENAME_RE.sub('-', info.filename).lower())
+            # Reject absolute names and '..' components that would write outside the destination
+            if os.path.commonpath([root, os.path.realpath(clean_filename)]) != root:
+                print(f'Skipping file outside the destination: {info.filename}')
+                continue
+            if info.is_dir():
+                os.makedirs(clean_filename, exist_ok=True)
+                continue
+            os.makedirs(os.path.dirname(clean_filename) or '.', exist_ok=True)
+            members.append((info, clean_filename))
+
+        # Each worker thread opens one ZipFile over the shared bytes and reuses it for all of its
+        # members, so members decompress in parallel without re-reading the central directory
+        readers = threading.local()
+
+        def extract_member(info, clean_filename):
+            if not hasattr(readers, 'zip_file'):
+                readers.zip_file = zipfile.ZipFile(MemoryFile(zip_data), 'r')
+            with readers.zip_file.open(info) as src, open(clean_filename, 'wb') as dst:
+                shutil.copyfileobj(io.BufferedReader(src, buffer_size=ZIP_BUFFER_SIZE), dst, length=ZIP_BUFFER_SIZE)
+
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            futures = [ executor.submit(extract_member, info, clean_filename) for info, clean_filename in members ]
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Extracting"):
+                future.result()
+        print(f"Successfully extracted {len(members)} files")
         return True
     except zipfile.BadZipFile:
-        print(f"Error: {zip_path} is not a valid zip file")
+        print(f"Error: {name} is not a valid zip file")
         return False
     except Exception as e:
         print(f"Error extracting zip file: {e}")
@@ -106,14 +252,21 @@ def create_s3_bucket_with_random_suffix(prefix):
         return None
 
 def upload_directory(path, bucket_name):
-    for root,dirs,files in os.walk(path):
-        for file in files:
-            file_to_upload = os.path.join(root,file)
-            basename = os.path.basename(file_to_upload)
-            if basename == ".DS_Store":
-                continue
-            print(f"uploading file {file_to_upload} to {bucket_name}")
-            s3_client.upload_file(file_to_upload,bucket_name,file)
+    # Collect the files with a single scandir pass (the knowledge base folder is flat),
+    # then upload them concurrently since each PUT is latency bound
+    with os.scandir(path) as entries:
+        jobs = [
+            (entry.path, entry.name) for entry in entries
+            if entry.name not in SKIPPED_FILENAMES and not entry.name.startswith('._') and entry.is_file()
+        ]
+
+    def upload(job):
+        file_to_upload, key = job
+        print(f"uploading file {file_to_upload} to {bucket_name}")
+        s3_client.upload_file(file_to_upload, bucket_name, key, Config=TRANSFER_CONFIG)
+
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+        list(executor.map(upload, jobs))
 
 def create_bedrock_knowledge_base(name, description, s3_bucket):
     knowledge_base = BedrockKnowledgeBase(
@@ -122,10 +275,23 @@ def create_bedrock_knowledge_base(name, description, s3_bucket):
         data_bucket_name=s3_bucket,
         embedding_model = "amazon.titan-embed-text-v2:0"
     )
-    print("Sleeping for 30 seconds.....")
-    time.sleep(30)
+    wait_for_knowledge_base_ready(knowledge_base.get_knowledge_base_id())
     return knowledge_base
 
+def wait_for_knowledge_base_ready(knowledge_base_id, timeout=60, interval=2):
+    # Poll the knowledge base status instead of sleeping for a fixed time
+    print(f"Waiting for Knowledge Base {knowledge_base_id} to become ACTIVE.....")
+    deadline = time.monotonic() + timeout
+    while True:
+        status = bedrock_agent_client.get_knowledge_base(knowledgeBaseId=knowledge_base_id)['knowledgeBase']['status']
+        if status == 'ACTIVE':
+            return
+        if status == 'FAILED':
+            raise RuntimeError(f"Knowledge Base {knowledge_base_id} failed to create")
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Knowledge Base {knowledge_base_id} is still {status} after {timeout} seconds")
+        time.sleep(interval)
+
 def ingest_knowledge_base_documents(knowledge_base_id, data_source_id, s3_bucket, kb_folder):
     # Ingest all files in folder into Bedrock Knowledge Base Custom Data Source
     kb_files = [ file for file in os.listdir(kb_folder) if file.endswith('.pdf') ]
@@ -133,9 +299,8 @@ def ingest_knowledge_base_documents(knowledge_base_id, data_source_id, s3_bucket
     documents = []
     for kb_file in kb_files:
         s3_uri = f's3://{s3_bucket}/{kb_file}'
-        clean_filename = re.sub(r'[\s-]+', '-', kb_file)
-        custom_document_identifier = os.path.splitext(clean_filename)[0]
-        custom_document_identifier = custom_document_identifier.lower()
+        clean_filename = CLEAN_FILENAME_RE.sub('-', kb_file)
+        custom_document_identifier = os.path.splitext(clean_filename)[0].lower()
         print(f'{s3_uri} -> Custom Document Identifier: "{custom_document_identifier}"')
         documents.append(
             {
@@ -153,57 +318,104 @@ def ingest_knowledge_base_documents(knowledge_base_id, data_source_id, s3_bucket
                 }
             }
         )
-    try:
-        response = bedrock_agent_client.ingest_knowledge_base_documents(
-            dataSourceId = data_source_id,
-            documents=documents,
-            knowledgeBaseId = knowledge_base_id
-        )
-        print(json.dumps(response, indent=2, default=str))
-    except Exception as e:
-        print(f'Exception: {e}')
-        return None
-    return response
 
+    def ingest(batch):
+        try:
+            response = bedrock_agent_client.ingest_knowledge_base_documents(
+                dataSourceId = data_source_id,
+                documents=batch,
+                knowledgeBaseId = knowledge_base_id
+            )
+            print(json.dumps(response, indent=2, default=str))
+        except Exception as e:
+            print(f'Exception: {e}')
+            return None
+        return response
+
+    # Ingest in fixed-size batches so each call stays small and a retry only repeats one batch
+    batches = [ documents[i:i + INGEST_BATCH_SIZE] for i in range(0, len(documents), INGEST_BATCH_SIZE) ]
+    with ThreadPoolExecutor(max_workers=INGEST_WORKERS) as executor:
+        responses = list(executor.map(ingest, batches))
+    return [ response for response in responses if response is not None ]
+
+
+def load_kb_config():
+    # Resources created by a previous run, so warm runs can skip the list calls
+    if not os.path.isfile(KB_CONFIG_FILE):
+        return {}
+    with open(KB_CONFIG_FILE) as f:
+        return json.load(f)
+
+def drop_stale_kb_config(config):
+    # Saved IDs may name resources deleted since the last run; forget those so they are rediscovered
+    if config.get('bucket'):
+        try:
+            s3_client.head_bucket(Bucket=config['bucket'])
+        except ClientError:
+            print(f"Saved S3 bucket {config['bucket']} is no longer available")
+            del config['bucket']
+    if config.get('kb_id') and config.get('data_source_id'):
+        try:
+            bedrock_agent_client.get_data_source(knowledgeBaseId=config['kb_id'], dataSourceId=config['data_source_id'])
+        except ClientError:
+            print(f"Saved Bedrock Knowledge Base {config['kb_id']} is no longer available")
+            del config['kb_id'], config['data_source_id']
+    return config
+
+def save_kb_config(config):
+    with open(KB_CONFIG_FILE, 'w') as f:
+        json.dump(config, f, indent=2)
 
 def main():
     folder = 'pets-kb-files'
+    config = drop_stale_kb_config(load_kb_config())
     if not os.path.isdir(folder):
-        download_file('https://d2qrbbbqnxtln.cloudfront.net/pets-kb-files.zip')
-        extract_zip_file('pets-kb-files.zip')
+        download_and_extract('https://d2qrbbbqnxtln.cloudfront.net/pets-kb-files.zip')
         s3_bucket = create_s3_bucket_with_random_suffix('bedrock-kb-bucket')
         print(f'Created S3 bucket: {s3_bucket}')
         upload_directory("pets-kb-files", s3_bucket)
+    elif config.get('bucket'):
+        print(f'Skipping download as folder {folder} already exists.')
+        s3_bucket = config['bucket']
     else:
-        print('Skipping download as folder {folder} already exists.')
+        print(f'Skipping download as folder {folder} already exists.')
         buckets = s3_client.list_buckets()['Buckets']
         s3_buckets = [ b['Name'] for b in buckets if b['Name'].startswith('bedrock-kb-bucket') ]
         s3_bucket = s3_buckets[0]
+    config['bucket'] = s3_bucket
 
     # Create Bedrock Knowledge Base
-    response = bedrock_agent_client.list_knowledge_bases()
-    knowledge_bases = response.get('knowledgeBaseSummaries')
-    if not len(knowledge_bases):
-        random_suffix = str(uuid.uuid4())[:8]
-        knowledge_base = create_bedrock_knowledge_base(
-            name = f'pets-kb-{random_suffix}',
-            description = 'Pets Knowledge Base on cats and dogs',
-            s3_bucket = s3_bucket
-        )
-        knowledge_base_id = knowledge_base.get_knowledge_base_id()
-        data_source_id = knowledge_base.get_datasource_id()
-        print(f'Created Bedrock Knowledge Base with ID: {knowledge_base_id}')
-    else:
+    if config.get('kb_id') and config.get('data_source_id'):
         print('Skipping Bedrock Knowledge Base Creation')
-        knowledge_base_id = knowledge_bases[0]['knowledgeBaseId']
-        response = bedrock_agent_client.list_data_sources(knowledgeBaseId=knowledge_base_id)
-        data_sources = response['dataSourceSummaries']
-        data_source_ids = [ d['dataSourceId'] for d in data_sources ]
-        if len(data_source_ids):
-            data_source_id = data_source_ids[0]
+        knowledge_base_id = config['kb_id']
+        data_source_id = config['data_source_id']
+    else:
+        response = bedrock_agent_client.list_knowledge_bases()
+        knowledge_bases = response.get('knowledgeBaseSummaries')
+        if not len(knowledge_bases):
+            random_suffix = str(uuid.uuid4())[:8]
+            knowledge_base = create_bedrock_knowledge_base(
+                name = f'pets-kb-{random_suffix}',
+                description = 'Pets Knowledge Base on cats and dogs',
+                s3_bucket = s3_bucket
+            )
+            knowledge_base_id = knowledge_base.get_knowledge_base_id()
+            data_source_id = knowledge_base.get_datasource_id()
+            print(f'Created Bedrock Knowledge Base with ID: {knowledge_base_id}')
         else:
-            print('Error: Data source not created. Please create a custom data source manually')
-            return
+            print('Skipping Bedrock Knowledge Base Creation')
+            knowledge_base_id = knowledge_bases[0]['knowledgeBaseId']
+            response = bedrock_agent_client.list_data_sources(knowledgeBaseId=knowledge_base_id)
+            data_sources = response['dataSourceSummaries']
+            data_source_ids = [ d['dataSourceId'] for d in data_sources ]
+            if len(data_source_ids):
+                data_source_id = data_source_ids[0]
+            else:
+                print('Error: Data source not created. Please create a custom data source manually')
+                return
+    config['kb_id'] = knowledge_base_id
+    config['data_source_id'] = data_source_id
+    save_kb_config(config)
 
     print(f'Loading documents into Bedrock Knowledge Base: {knowledge_base_id}')
     print(f'Data Source ID: {data_source_id}')
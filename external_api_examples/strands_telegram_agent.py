@@ -19,16 +19,23 @@ Environment Setup
    export TELEGRAM_CHAT_ID="..."
 """
 
+import asyncio
 import json
 import logging
 import os
 import requests
-import urllib.parse
 
 from botocore.config import Config
+from requests.adapters import HTTPAdapter
 from strands import Agent, tool
 from strands.models.bedrock import BedrockModel
 
+# orjson parses the Telegram responses faster when it is installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 # Set up logging
 logging.basicConfig(
@@ -57,12 +64,33 @@ model = BedrockModel(
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 TELEGRAM_API_KEY = os.getenv('TELEGRAM_API_KEY')
 
-if not TELEGRAM_API_KEY or not TELEGRAM_CHAT_ID:
-    logger.error("TELEGRAM_API_KEY and TELEGRAM_CHAT_ID environment variables must be set.")
-    logger.error("See the setup instructions in the file header.")
+def require_telegram_credentials():
+    """Raise if the Telegram credentials are missing from the environment."""
+    if not TELEGRAM_API_KEY or not TELEGRAM_CHAT_ID:
+        raise RuntimeError(
+            "TELEGRAM_API_KEY and TELEGRAM_CHAT_ID environment variables must be set. "
+            "See the setup instructions in the file header."
+        )
+
+# Reuse one keep-alive session for all Telegram calls to avoid a TLS handshake per request
+TELEGRAM_API_URL = f'https://api.telegram.org/bot{TELEGRAM_API_KEY}'
+telegram_session = requests.Session()
+telegram_session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+async def call_telegram(method: str, payload: dict = None) -> dict:
+    """POST to a Telegram Bot API method off the event loop, so tool calls can overlap."""
+    response = await asyncio.to_thread(
+        telegram_session.post,
+        f'{TELEGRAM_API_URL}/{method}',
+        json=payload,
+        timeout=10
+    )
+    response = orjson.loads(response.content) if orjson else response.json()
+    logger.info(response)
+    return response
 
 @tool
-def send_telegram_message(message: str, chat_id: str = TELEGRAM_CHAT_ID) -> str:
+async def send_telegram_message(message: str, chat_id: str = TELEGRAM_CHAT_ID) -> str:
     """Send a message to a Telegram chat using the Telegram Bot API.
     
     Args:
@@ -72,15 +100,10 @@ def send_telegram_message(message: str, chat_id: str = TELEGRAM_CHAT_ID) -> str:
     Returns:
         JSON string containing the Telegram API response.
     """
-    encoded_message = urllib.parse.quote(message)
-    url = f'https://api.telegram.org/bot{TELEGRAM_API_KEY}/sendMessage?chat_id={chat_id}&text={encoded_message}'
-    response = requests.get(url)
-    response = response.json()
-    logger.info(response)
-    return response
+    return await call_telegram('sendMessage', {'chat_id': chat_id, 'text': message})
 
 @tool
-def telegram_set_webhook(webhook_url: str = ''):
+async def telegram_set_webhook(webhook_url: str = ''):
     """Specify a url and receive incoming updates via an outgoing webhook.
     
     Args:
@@ -97,14 +120,10 @@ def telegram_set_webhook(webhook_url: str = ''):
     Reference:
         - https://core.telegram.org/bots/api#setwebhook
     """
-    url = f'https://api.telegram.org/bot{TELEGRAM_API_KEY}/setWebhook?url={webhook_url}'
-    response = requests.get(url)
-    response = response.json()
-    logger.info(response)
-    return response
+    return await call_telegram('setWebhook', {'url': webhook_url})
 
 @tool
-def telegram_get_updates():
+async def telegram_get_updates():
     """Get updates from the Telegram Bot API.
     
     Returns:
@@ -119,16 +138,10 @@ def telegram_get_updates():
     Reference:
         - https://core.telegram.org/bots/api#getupdates
     """
-    url = f'https://api.telegram.org/bot{TELEGRAM_API_KEY}/getUpdates'
-    response = requests.get(url)
-    response = response.json()
-    logger.info(response)
-    return response
+    return await call_telegram('getUpdates')
 
 def main():
-    if not TELEGRAM_API_KEY or not TELEGRAM_CHAT_ID:
-        logger.error("Cannot run: Missing Telegram credentials")
-        return
+    require_telegram_credentials()
 
     print("\nTelegram API Strands Agent\n")
     print("This example demonstrates using Strands Agents to interact with the Telegram API")
@@ -140,12 +153,6 @@ def main():
     print("  'get updates' - Get recent updates from your bot")
     print("  'exit' - Exit the program")
 
-    # Check if credentials are set before running
-    if not TELEGRAM_API_KEY or not TELEGRAM_CHAT_ID:
-        logger.error("Cannot run: Missing Telegram credentials")
-        logger.error("Please set TELEGRAM_API_KEY and TELEGRAM_CHAT_ID environment variables")
-        return
-        
     # Interactive loop
     while True:
         try:
@@ -1,21 +1,58 @@
 #!/usr/bin/env python
 
-import boto3
+import argparse
 import json
 import os
+import time
 
-from strands import Agent
-from strands.models import BedrockModel
+from functools import lru_cache
+
+# boto3 and strands are imported inside the functions that use them, so --help stays fast
 
 
 region = os.getenv('AWS_REGION', 'us-west-2')
-bedrock = boto3.client('bedrock', region_name=region)
-bedrock_runtime = boto3.client('bedrock-runtime', region_name=region)
+
+# Guardrail list cached between runs for 10 minutes
+GUARDRAILS_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'strands', f'guardrails-{region}.json')
+GUARDRAILS_CACHE_TTL = 600
+
+# Printed before each question
+SEPARATOR = '-' * 80
+
+
+@lru_cache(maxsize=None)
+def get_session():
+    # One session for the guardrail lookup and the model, so credentials are resolved once.
+    # Created on first use, so importing this module makes no AWS calls
+    import boto3
+
+    return boto3.session.Session(region_name=region)
+
+
+@lru_cache(maxsize=None)
+def get_bedrock():
+    return get_session().client('bedrock')
 
 
-def list_guardrail_ids():
-    response = bedrock.list_guardrails()
-    guardrails = response.get('guardrails', [])
+def list_guardrails(refresh=False):
+    # Reuse the guardrail list from a recent run, since it rarely changes
+    try:
+        if not refresh and time.time() - os.path.getmtime(GUARDRAILS_CACHE_FILE) < GUARDRAILS_CACHE_TTL:
+            with open(GUARDRAILS_CACHE_FILE) as f:
+                return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    response = get_bedrock().list_guardrails()
+    guardrails = [ { 'id': g['id'], 'name': g['name'] } for g in response.get('guardrails', []) ]
+    os.makedirs(os.path.dirname(GUARDRAILS_CACHE_FILE), exist_ok=True)
+    with open(GUARDRAILS_CACHE_FILE, 'w') as f:
+        json.dump(guardrails, f)
+    return guardrails
+
+
+def list_guardrail_ids(refresh=False):
+    guardrails = list_guardrails(refresh)
     if len(guardrails) > 0:
         for guardrail in guardrails:
             id = guardrail['id']
@@ -27,12 +64,16 @@ def list_guardrail_ids():
 
 
 def main(guardrail_id):
+    from strands import Agent
+    from strands.models import BedrockModel
+
     # Create a Bedrock model with guardrail configuration
     bedrock_model = BedrockModel(
         model_id = "us.amazon.nova-micro-v1:0",
         guardrail_id = guardrail_id,         # Your Bedrock guardrail ID
         guardrail_version = "DRAFT",         # Guardrail version
         guardrail_trace = "enabled",         # Enable trace info for debugging
+        boto_session = get_session(),
     )
 
     # Create agent with the guardrail-protected model
@@ -48,7 +89,7 @@ def main(guardrail_id):
     ]
     
     for prompt in prompts:
-        print('-' * 80)
+        print(SEPARATOR)
         print(f'**Question**: {prompt}')
         print(f'**Response**:')
         response = agent(prompt)
@@ -57,12 +98,21 @@ def main(guardrail_id):
         if response.stop_reason == "guardrail_intervened":
             print("\nContent was blocked by guardrails, conversation context overwritten!")
 
-        print(f"\nConversation: {json.dumps(agent.messages, indent=4)}\n")
+        # Print only the turn just added instead of re-serializing the whole conversation
+        print(f"\nLatest turn: {json.dumps(agent.messages[-2:], indent=4)}\n")
 
 
-guardrail_ids = list_guardrail_ids()
-
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Strands Agent with Bedrock Guardrails")
+    parser.add_argument("--refresh", action="store_true", help="List the guardrails again instead of using the cache")
+    args = parser.parse_args()
+
+    # Fail fast without a Bedrock round-trip when AWS credentials are not configured
+    if get_session().get_credentials() is None:
+        print('No AWS credentials found. Please configure credentials for Amazon Bedrock first.')
+        raise SystemExit(1)
+
+    guardrail_ids = list_guardrail_ids(refresh=args.refresh)
     if len(guardrail_ids):
         main(guardrail_ids[0])
     else:
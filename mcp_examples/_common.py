@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+
+"""
+Shared helpers for the MCP example agents.
+
+MCP clients and Bedrock models are built on first use and memoized, so importing
+an example (or running it with --help) does not spawn a uvx subprocess or create
+boto clients. The strands and mcp packages are likewise imported only by the
+helpers that need them.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+
+from contextlib import ExitStack
+from functools import lru_cache
+from pathlib import Path
+from shutil import which
+
+from botocore.config import Config
+
+# Client config shared by every Bedrock model; the pool is sized for concurrent prompts
+DEFAULT_CONFIG = Config(
+    read_timeout = 120,
+    connect_timeout = 120,
+    max_pool_connections = 64,
+    retries = dict(max_attempts=3, mode="adaptive"),
+    tcp_keepalive = True,
+)
+
+# Slow lookups whose results rarely change are kept on disk between runs
+CACHE_DIR = Path.home() / '.cache' / 'strands'
+TOOLS_CACHE_TTL = 600
+RESPONSE_CACHE_DB = CACHE_DIR / 'responses.sqlite3'
+RESPONSE_CACHE_TTL = 86400
+
+# Printed between responses
+SEPARATOR = '\n' + '-' * 80 + '\n'
+
+
+def setup_logging() -> None:
+    """Configure root logging once, however many of the example modules are imported."""
+    if logging.getLogger().handlers:
+        return
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s | %(levelname)s | %(name)s | %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S',
+        handlers=[logging.StreamHandler()]
+    )
+    logging.getLogger("strands").setLevel(logging.INFO)
+
+
+def ask(prompt: str) -> str:
+    """Prompt for one line on stdin, like input() but without readline.
+
+    Raises:
+        EOFError: If stdin is closed
+    """
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line.rstrip('\n')
+
+
+@lru_cache(maxsize=None)
+def uvx_command() -> str:
+    """Return the path to uvx, looked up on PATH once per process."""
+    return which('uvx') or os.path.join(os.path.expanduser('~'), '.local', 'bin', 'uvx')
+
+
+@lru_cache(maxsize=None)
+def get_mcp_client(server_package: str, **env: str) -> 'MCPClient':
+    """Return the MCP client for a uvx-launched MCP server package.
+
+    Args:
+        server_package: The uvx package running the server, e.g. 'awslabs.aws-pricing-mcp-server@latest'
+        **env: Environment variables passed to the server process
+
+    Returns:
+        MCPClient: Configured MCP client, shared by every caller with the same arguments
+    """
+    from mcp import stdio_client, StdioServerParameters
+    from strands.tools.mcp.mcp_client import MCPClient
+
+    return MCPClient(lambda: stdio_client(
+        StdioServerParameters(
+            command = uvx_command(),
+            args = [ server_package ],
+            env = env,
+            disabled = False,
+            autoApprove = []
+        )
+    ))
+
+
+def multi_mcp(clients) -> ExitStack:
+    """Start several MCP clients together; closing the returned stack stops them all.
+
+    Args:
+        clients: MCP clients to start
+
+    Returns:
+        ExitStack: Use as a context manager around the code calling the clients' tools
+    """
+    stack = ExitStack()
+    try:
+        for client in clients:
+            stack.enter_context(client)
+    except BaseException:
+        stack.close()
+        raise
+    return stack
+
+
+@lru_cache(maxsize=None)
+def get_bedrock_model(model_id: str, temperature: float = 0.1) -> 'BedrockModel':
+    """Return the Bedrock model for a model ID.
+
+    Args:
+        model_id: The Bedrock model ID to use
+        temperature: Model temperature (lower is more deterministic)
+
+    Returns:
+        BedrockModel: Configured Bedrock model, shared by every caller with the same arguments
+    """
+    from strands.models.bedrock import BedrockModel
+
+    return BedrockModel(
+        model_id = model_id,
+        max_tokens = 2048,
+        boto_client_config = DEFAULT_CONFIG,
+        temperature = temperature
+    )
+
+
+@lru_cache(maxsize=None)
+def get_response_cache() -> sqlite3.Connection:
+    """Return the SQLite database holding batch responses from earlier runs."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(RESPONSE_CACHE_DB, check_same_thread=False)
+    db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT, ts INTEGER)")
+    return db
+
+
+def response_cache_key(agent, prompt: str) -> str:
+    """Return the cache key for a prompt sent to an agent's model and system prompt.
+
+    Tool results depend on the AWS profile, region and day the prompt runs in, so
+    they are part of the key too.
+    """
+    model_id = agent.model.get_config().get('model_id')
+    scope = [ os.environ.get('AWS_PROFILE'), os.environ.get('AWS_REGION'), time.strftime('%Y-%m-%d') ]
+    payload = json.dumps([model_id, agent.system_prompt, prompt, scope])
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+async def run_all(make_agent, prompts, concurrency: int = 5, use_cache: bool = False):
+    """Run prompts concurrently, each through its own agent so conversations stay separate.
+
+    Args:
+        make_agent: Callable returning a new Agent; agents share the model and MCP tools
+        prompts: Prompts to run
+        concurrency: Maximum number of Bedrock requests in flight
+        use_cache: If True, reuse and store responses from the last RESPONSE_CACHE_TTL seconds
+
+    Yields:
+        tuple: (prompt, response text) pairs, in the order the responses complete
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    db = get_response_cache() if use_cache else None
+
+    async def run_one(prompt):
+        agent = make_agent()
+        if use_cache:
+            key = response_cache_key(agent, prompt)
+            row = db.execute(
+                "SELECT response FROM responses WHERE key = ? AND ts > ?",
+                (key, int(time.time()) - RESPONSE_CACHE_TTL)
+            ).fetchone()
+            if row:
+                return prompt, row[0]
+
+        async with semaphore:
+            response = str(await agent.invoke_async(prompt))
+        if use_cache:
+            db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (key, response, int(time.time())))
+            db.commit()
+        return prompt, response
+
+    for result in asyncio.as_completed([ run_one(prompt) for prompt in prompts ]):
+        yield await result
+
+
+async def print_all(make_agent, prompts, use_cache: bool = False) -> None:
+    """Run prompts with run_all and print each response as soon as it completes."""
+    async for prompt, response in run_all(make_agent, prompts, use_cache=use_cache):
+        sys.stdout.write(f'**Prompt**: {prompt}\n{response}\n{SEPARATOR}\n')
+        sys.stdout.flush()
+
+
+def cached_json(key: str, ttl: float, fn, refresh: bool = False):
+    """Return fn()'s JSON-serializable result, reusing the copy on disk while it is younger than ttl.
+
+    Args:
+        key: Cache file name, without the .json suffix
+        ttl: Maximum age of the cached copy in seconds
+        fn: Callable producing the value on a cache miss
+        refresh: If True, ignore the cached copy and call fn()
+
+    Returns:
+        The cached or freshly computed value
+    """
+    path = CACHE_DIR / f'{key}.json'
+    if not refresh:
+        try:
+            if time.time() - path.stat().st_mtime < ttl:
+                return json.loads(path.read_text())
+        except (OSError, ValueError):
+            pass
+
+    value = fn()
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(value, default=str))
+    return value
+
+
+def cached_tools(client: 'MCPClient', name: str, refresh: bool = False) -> list:
+    """Return the MCP server's tools, rebuilding them from cached schemas instead of calling list_tools.
+
+    Args:
+        client: The started MCP client the tools are called through
+        name: Cache key for this server's tool schemas
+        refresh: If True, list the tools from the server again
+
+    Returns:
+        list: MCPAgentTool objects bound to client
+    """
+    from mcp.types import Tool as MCPTool
+    from strands.tools.mcp.mcp_agent_tool import MCPAgentTool
+
+    specs = cached_json(
+        f'tools-{name}',
+        TOOLS_CACHE_TTL,
+        lambda: [ tool.mcp_tool.model_dump(mode='json') for tool in client.list_tools_sync() ],
+        refresh
+    )
+    return [ MCPAgentTool(MCPTool.model_validate(spec), client) for spec in specs ]
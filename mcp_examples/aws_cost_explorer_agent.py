@@ -1,56 +1,27 @@
 #!/usr/bin/env python
 
+import argparse
+import asyncio
 import logging
 import os
 import random
 
-from botocore.config import Config
-from mcp import stdio_client, StdioServerParameters
-from shutil import which
-
-from strands import Agent
-from strands.models.bedrock import BedrockModel
-from strands.tools.mcp.mcp_client import MCPClient
+from _common import cached_tools, get_bedrock_model, get_mcp_client, print_all, setup_logging
 
 # Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s | %(levelname)s | %(name)s | %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[logging.StreamHandler()]
-)
+setup_logging()
 logger = logging.getLogger(__name__)
-logging.getLogger("strands").setLevel(logging.INFO)
 
 HOME = os.getenv('HOME')
 BEDROCK_REGION = os.getenv("BEDROCK_REGION", 'us-west-2')
 BEDROCK_MODEL_ID = "us.amazon.nova-lite-v1:0"
 
-# AWS Cost Explorer MCP Server
-stdio_mcp_client = MCPClient(lambda: stdio_client(
-    StdioServerParameters(
-        command = which('uvx'),
-        args = [ 'awslabs.cost-explorer-mcp-server@latest' ],
-        env = {
-          "FASTMCP_LOG_LEVEL": "ERROR",
-          "AWS_PROFILE": "default"
-        },
-        disabled = False,
-        autoApprove = []
-    )
-))
-
-# Initialize Strands Agent
-model = BedrockModel(
-    model_id = BEDROCK_MODEL_ID,
-    max_tokens = 2048,
-    boto_client_config = Config(
-        read_timeout = 120,
-        connect_timeout = 120,
-        retries = dict(max_attempts=3, mode="adaptive"),
-    ),
-    temperature = 0.1
-)
+# AWS Cost Explorer MCP Server, started in main()
+MCP_SERVER_PACKAGE = 'awslabs.cost-explorer-mcp-server@latest'
+MCP_SERVER_ENV = {
+    "FASTMCP_LOG_LEVEL": "ERROR",
+    "AWS_PROFILE": "default"
+}
 
 AWS_COST_EXPLORER_SYSTEM_PROMPT = """You are an AWS Cost Explorer assistant with access to AWS Cost Explorer tools.
 
@@ -62,33 +33,50 @@ Use the available tools to:
 
 Provide accurate cost analysis based on AWS Cost Explorer data."""
 
-EXAMPLE_PROMPTS = """Show me my AWS costs for the last 3 months grouped by service in us-east-1 region
-Break down my S3 costs by storage class for Q1 2025
-Show me costs for production resources tagged with Environment=prod
-What was my EC2 instance usage by instance type?
-Compare my AWS costs between April and May 2025
-How did my EC2 costs change from last month to this month?
-Why did my AWS bill increase in June compared to May?
-What caused the spike in my S3 costs last month?
-Forecast my AWS costs for next month
-Predict my EC2 spending for the next quarter
-What will my total AWS bill be for the rest of 2025?"""
-prompts = random.sample(EXAMPLE_PROMPTS.split('\n'), 3)
-
-def main():
+EXAMPLE_PROMPTS = (
+    "Show me my AWS costs for the last 3 months grouped by service in us-east-1 region",
+    "Break down my S3 costs by storage class for Q1 2025",
+    "Show me costs for production resources tagged with Environment=prod",
+    "What was my EC2 instance usage by instance type?",
+    "Compare my AWS costs between April and May 2025",
+    "How did my EC2 costs change from last month to this month?",
+    "Why did my AWS bill increase in June compared to May?",
+    "What caused the spike in my S3 costs last month?",
+    "Forecast my AWS costs for next month",
+    "Predict my EC2 spending for the next quarter",
+    "What will my total AWS bill be for the rest of 2025?",
+)
+
+def pick_prompts(k=3, seed=None):
+    # A fixed seed picks the same prompts on every run
+    return random.Random(seed).sample(EXAMPLE_PROMPTS, k)
+
+def main(refresh=False, seed=None, use_cache=False):
+    from strands import Agent
+
+    prompts = pick_prompts(seed=seed)
+
+    stdio_mcp_client = get_mcp_client(MCP_SERVER_PACKAGE, **MCP_SERVER_ENV)
+    model = get_bedrock_model(BEDROCK_MODEL_ID)
+
     with stdio_mcp_client:
-        tools = stdio_mcp_client.list_tools_sync()
-        aws_docs_agent = Agent(
-            system_prompt = AWS_COST_EXPLORER_SYSTEM_PROMPT,
-            model = model,
-            tools = tools,
-            # callback_handler = None
-        )
-
-        for prompt in prompts:
-            print(f'**Prompt**: {prompt}')
-            response = aws_docs_agent(prompt)
-            print('\n' + '-' * 80 + '\n')
+        tools = cached_tools(stdio_mcp_client, 'cost-explorer', refresh)
+
+        # One agent per prompt so the prompts can run concurrently
+        def make_agent():
+            return Agent(
+                system_prompt = AWS_COST_EXPLORER_SYSTEM_PROMPT,
+                model = model,
+                tools = tools,
+                callback_handler = None
+            )
+
+        asyncio.run(print_all(make_agent, prompts, use_cache=use_cache))
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="AWS Cost Explorer MCP Server Demo")
+    parser.add_argument("--refresh", action="store_true", help="List the MCP server tools again instead of using the cache")
+    parser.add_argument("--seed", type=int, help="Seed for picking the example prompts, for repeatable runs")
+    parser.add_argument("--cache", action="store_true", help="Reuse responses to the same prompts from earlier today")
+    args = parser.parse_args()
+    main(refresh=args.refresh, seed=args.seed, use_cache=args.cache)
@@ -1,55 +1,26 @@
 #!/usr/bin/env python
 
+import argparse
+import asyncio
 import logging
 import os
 
-from botocore.config import Config
-from mcp import stdio_client, StdioServerParameters
-from shutil import which
-
-from strands import Agent
-from strands.models.bedrock import BedrockModel
-from strands.tools.mcp.mcp_client import MCPClient
+from _common import SEPARATOR, ask, cached_tools, get_bedrock_model, get_mcp_client, print_all, setup_logging
 
 # Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s | %(levelname)s | %(name)s | %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[logging.StreamHandler()]
-)
+setup_logging()
 logger = logging.getLogger(__name__)
-logging.getLogger("strands").setLevel(logging.INFO)
 
 HOME = os.getenv('HOME')
 BEDROCK_REGION = os.getenv("BEDROCK_REGION", 'us-west-2')
 BEDROCK_MODEL_ID = "us.amazon.nova-lite-v1:0"
 
-# AWS Documentation MCP Server
-stdio_mcp_client = MCPClient(lambda: stdio_client(
-    StdioServerParameters(
-        command = which('uvx'),
-        args = [ 'awslabs.aws-documentation-mcp-server@latest' ],
-        env = {
-          "FASTMCP_LOG_LEVEL": "ERROR",
-          "AWS_DOCUMENTATION_PARTITION": "aws"
-        },
-        disabled = False,
-        autoApprove = []
-    )
-))
-
-# Initialize Strands Agent
-model = BedrockModel(
-    model_id = BEDROCK_MODEL_ID,
-    max_tokens = 2048,
-    boto_client_config = Config(
-        read_timeout = 120,
-        connect_timeout = 120,
-        retries = dict(max_attempts=3, mode="adaptive"),
-    ),
-    temperature = 0.1
-)
+# AWS Documentation MCP Server, started in main()
+MCP_SERVER_PACKAGE = 'awslabs.aws-documentation-mcp-server@latest'
+MCP_SERVER_ENV = {
+    "FASTMCP_LOG_LEVEL": "ERROR",
+    "AWS_DOCUMENTATION_PARTITION": "aws"
+}
 
 AWS_DOCS_SYSTEM_PROMPT = """You are an AWS documentation assistant with access to AWS Documentation tools.
 
@@ -65,10 +36,37 @@ prompts = [
     "What can I update my Lambda function code that I've created?",
     "How may I set up VPC flow logging?"
 ]
+PROMPTS_BANNER = '\n'.join('- ' + p for p in prompts)
+
+def run_batch(batch_file, model, tools, use_cache=False):
+    from strands import Agent
+
+    # Run every non-empty line of the file as a prompt, concurrently
+    with open(batch_file) as f:
+        batch_prompts = [ line.strip() for line in f if line.strip() ]
+
+    def make_agent():
+        return Agent(
+            system_prompt = AWS_DOCS_SYSTEM_PROMPT,
+            model = model,
+            tools = tools,
+            callback_handler = None
+        )
+
+    asyncio.run(print_all(make_agent, batch_prompts, use_cache=use_cache))
+
+def main(batch_file=None, refresh=False, use_cache=False):
+    from strands import Agent
+
+    stdio_mcp_client = get_mcp_client(MCP_SERVER_PACKAGE, **MCP_SERVER_ENV)
+    model = get_bedrock_model(BEDROCK_MODEL_ID)
 
-def main():
     with stdio_mcp_client:
-        tools = stdio_mcp_client.list_tools_sync()
+        tools = cached_tools(stdio_mcp_client, 'aws-documentation', refresh)
+        if batch_file:
+            run_batch(batch_file, model, tools, use_cache)
+            return
+
         aws_docs_agent = Agent(
             system_prompt = AWS_DOCS_SYSTEM_PROMPT,
             model = model,
@@ -81,18 +79,27 @@ def main():
         print('AWS Documentation Agent Demo')
         print('----------------------------')
         print('\nExample prompts to try:')
-        print('\n'.join(['- ' + p for p in prompts]))
+        print(PROMPTS_BANNER)
         print("\nType 'exit' to quit.\n")
 
         while True:
-            user_input = input("Question: ")
+            user_input = ask("Question: ")
 
             if user_input.lower() in ["exit", "quit"]:
                 break
 
             print("\nThinking...\n")
             response = aws_docs_agent(user_input)
-            print('\n' + '-' * 80 + '\n')
+            print(SEPARATOR)
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="AWS Documentation MCP Server Demo")
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Answer each line of FILE as a prompt, concurrently, instead of starting the interactive loop"
+    )
+    parser.add_argument("--refresh", action="store_true", help="List the MCP server tools again instead of using the cache")
+    parser.add_argument("--cache", action="store_true", help="Reuse responses to the same prompts from earlier today")
+    args = parser.parse_args()
+    main(batch_file=args.batch, refresh=args.refresh, use_cache=args.cache)
@@ -55,25 +55,15 @@ import logging
 import os
 import sys
 
+from _common import DEFAULT_CONFIG, SEPARATOR, ask, cached_tools, setup_logging, uvx_command
 from botocore.config import Config
-from mcp import stdio_client, StdioServerParameters
 from shutil import which
-from typing import List
 
-from strands import Agent
-from strands.models.bedrock import BedrockModel
-from strands.tools.mcp.mcp_client import MCPClient
-from strands.handlers.callback_handler import PrintingCallbackHandler
+# strands and mcp are imported inside the functions that use them, so --help stays fast
 
 # Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s | %(levelname)s | %(name)s | %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[logging.StreamHandler()]
-)
+setup_logging()
 logger = logging.getLogger(__name__)
-logging.getLogger("strands").setLevel(logging.INFO)
 logging.getLogger("strands.agent").setLevel(logging.INFO)
 logging.getLogger("strands.event_loop").setLevel(logging.INFO)
 logging.getLogger("strands.handlers").setLevel(logging.INFO)
@@ -82,16 +72,10 @@ logging.getLogger("strands.tools").setLevel(logging.INFO)
 logging.getLogger("strands.types").setLevel(logging.INFO)
 
 # Configuration with environment variable fallbacks
-HOME = os.getenv('HOME')
-PWD = os.getenv('PWD', os.getcwd())
 BEDROCK_REGION = os.getenv("BEDROCK_REGION", 'us-west-2')
 BEDROCK_MODEL_ID = os.getenv("BEDROCK_MODEL_ID", "us.amazon.nova-lite-v1:0")
-AWS_API_MCP_WORKING_DIR = os.getenv('AWS_API_MCP_WORKING_DIR', os.path.join(PWD, "api_mcp_server"))
 
-# Ensure working directory exists
-os.makedirs(AWS_API_MCP_WORKING_DIR, exist_ok=True)
-
-def create_mcp_client(use_npx: bool = False) -> MCPClient:
+def create_mcp_client(use_npx: bool = False) -> 'MCPClient':
     """Create an MCP client for the AWS Knowledge MCP Server.
     
     Args:
@@ -103,6 +87,9 @@ def create_mcp_client(use_npx: bool = False) -> MCPClient:
     Raises:
         RuntimeError: If required command is not found
     """
+    from mcp import stdio_client, StdioServerParameters
+    from strands.tools.mcp.mcp_client import MCPClient
+
     if use_npx:
         cmd = which('npx')
         if not cmd:
@@ -117,8 +104,8 @@ def create_mcp_client(use_npx: bool = False) -> MCPClient:
             )
         ))
     else:
-        cmd = which('uvx')
-        if not cmd:
+        cmd = uvx_command()
+        if not os.path.exists(cmd):
             raise RuntimeError("uvx command not found. Please install uvx.")
         return MCPClient(lambda: stdio_client(
             StdioServerParameters(
@@ -132,7 +119,7 @@ def create_mcp_client(use_npx: bool = False) -> MCPClient:
             )
         ))
 
-def create_bedrock_model(model_id: str, region: str, temperature: float = 0.1) -> BedrockModel:
+def create_bedrock_model(model_id: str, region: str, temperature: float = 0.1) -> 'BedrockModel':
     """Create a Bedrock model with appropriate configuration.
     
     Args:
@@ -143,15 +130,12 @@ def create_bedrock_model(model_id: str, region: str, temperature: float = 0.1) -
     Returns:
         BedrockModel: Configured Bedrock model
     """
+    from strands.models.bedrock import BedrockModel
+
     return BedrockModel(
         model_id=model_id,
         max_tokens=2048,
-        boto_client_config=Config(
-            region_name=region,
-            read_timeout=120,
-            connect_timeout=120,
-            retries=dict(max_attempts=3, mode="adaptive"),
-        ),
+        boto_client_config=DEFAULT_CONFIG.merge(Config(region_name=region)),
         temperature=temperature
     )
 
@@ -173,46 +157,54 @@ prompts = [
     "What's the recommended architecture for a highly available web application?",
     "Show me recent announcements about Amazon EKS"
 ]
+PROMPTS_BANNER = '\n'.join('- ' + p for p in prompts)
 
-def run_interactive_session(agent: Agent, example_prompts: List[str]) -> None:
+def run_interactive_session(agent: 'Agent', prompts_banner: str, print_response: bool = False) -> None:
     """Run an interactive session with the AWS Knowledge Agent.
     
     Args:
         agent: The configured Strands Agent
-        example_prompts: List of example prompts to show the user
+        prompts_banner: Example prompts to show the user, one per line
+        print_response: If True, print each answer (for agents without a printing callback handler)
     """
     print('------------------------')
     print('AWS Knowledge Agent Demo')
     print('------------------------')
     print('\nExample prompts to try:')
-    print('\n'.join(['- ' + p for p in example_prompts]))
+    print(prompts_banner)
     print("\nType 'exit' to quit.\n")
 
     while True:
         try:
-            user_input = input("Question: ")
+            user_input = ask("Question: ")
 
             if user_input.lower() in ["exit", "quit"]:
                 break
 
             print("\nThinking...\n")
             response = agent(user_input)
-            print('\n' + '-' * 80 + '\n')
-        except KeyboardInterrupt:
+            if print_response:
+                print(response)
+            print(SEPARATOR)
+        except (KeyboardInterrupt, EOFError):
             print("\nExiting...")
             break
         except Exception as e:
             print(f"\nError: {e}\n")
 
 
-def main(use_npx: bool = False) -> None:
+def main(use_npx: bool = False, verbose: bool = False, refresh: bool = False) -> None:
     """Main entry point for the AWS Knowledge MCP Server demo.
     
     Args:
         use_npx: If True, use npx instead of uvx for the MCP client
         verbose: If True, enable verbose logging
+        refresh: If True, list the MCP server tools again instead of using the cache
     """
-    logging.getLogger("strands").setLevel(logging.DEBUG)
+    from strands import Agent
+    from strands.handlers.callback_handler import PrintingCallbackHandler
+
+    logging.getLogger("strands").setLevel(logging.DEBUG if verbose else logging.INFO)
     
     try:
         # Create MCP client
@@ -226,18 +218,18 @@ def main(use_npx: bool = False) -> None:
         
         with mcp_client:
             # Get available tools
-            tools = mcp_client.list_tools_sync()
+            tools = cached_tools(mcp_client, 'aws-knowledge', refresh)
             
-            # Create agent with callback handler for better visibility
+            # Stream tokens and tool events only in verbose mode; otherwise print each final answer
             aws_knowledge_agent = Agent(
                 system_prompt = AWS_KNOWLEDGE_SYSTEM_PROMPT,
                 model = model,
                 tools = tools,
-                callback_handler = PrintingCallbackHandler()
+                callback_handler = PrintingCallbackHandler() if verbose else None
             )
             
             # Run interactive session
-            run_interactive_session(aws_knowledge_agent, prompts)
+            run_interactive_session(aws_knowledge_agent, PROMPTS_BANNER, print_response=not verbose)
             
     except Exception as e:
         logger.error(f"Error initializing AWS Knowledge Agent: {e}")
@@ -260,9 +252,14 @@ def parse_args():
         action="store_true", 
         help="Enable verbose logging"
     )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="List the MCP server tools again instead of using the cache"
+    )
     return parser.parse_args()
 
 
 if __name__ == '__main__':
     args = parse_args()
-    main(use_npx=args.npx)
+    main(use_npx=args.npx, verbose=args.verbose, refresh=args.refresh)
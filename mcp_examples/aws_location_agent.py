@@ -1,55 +1,25 @@
 #!/usr/bin/env python
 
+import argparse
 import logging
 import os
 
-from botocore.config import Config
-from mcp import stdio_client, StdioServerParameters
-from shutil import which
-
-from strands import Agent
-from strands.models.bedrock import BedrockModel
-from strands.tools.mcp.mcp_client import MCPClient
+from _common import SEPARATOR, ask, cached_tools, get_bedrock_model, get_mcp_client, setup_logging
 
 # Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s | %(levelname)s | %(name)s | %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[logging.StreamHandler()]
-)
+setup_logging()
 logger = logging.getLogger(__name__)
-logging.getLogger("strands").setLevel(logging.INFO)
 
 HOME = os.getenv('HOME')
 BEDROCK_REGION = os.getenv("BEDROCK_REGION", 'us-west-2')
 BEDROCK_MODEL_ID = "us.amazon.nova-lite-v1:0"
 
-# Amazon Location Services MCP Server
-stdio_mcp_client = MCPClient(lambda: stdio_client(
-    StdioServerParameters(
-        command = which('uvx'),
-        args = [ 'awslabs.aws-location-mcp-server@latest' ],
-        env = {
-          "AWS_REGION": BEDROCK_REGION,
-          "FASTMCP_LOG_LEVEL": "ERROR"
-        },
-        disabled = False,
-        autoApprove = []
-    )
-))
-
-# Initialize Strands Agent
-model = BedrockModel(
-    model_id = BEDROCK_MODEL_ID,
-    max_tokens = 2048,
-    boto_client_config = Config(
-        read_timeout = 120,
-        connect_timeout = 120,
-        retries = dict(max_attempts=3, mode="adaptive"),
-    ),
-    temperature = 0.1
-)
+# Amazon Location Services MCP Server, started in main()
+MCP_SERVER_PACKAGE = 'awslabs.aws-location-mcp-server@latest'
+MCP_SERVER_ENV = {
+    "AWS_REGION": BEDROCK_REGION,
+    "FASTMCP_LOG_LEVEL": "ERROR"
+}
 
 LOCATION_SYSTEM_PROMPT = """You are a location services assistant with access to Amazon Location Services tools.
 
@@ -67,11 +37,17 @@ prompts = [
     "What's nearby to zip code 98109-5210?",
     "Give me the driving directions from zip code 98109-5210 to the Seattle Airport"
 ]
+PROMPTS_BANNER = '\n'.join('- ' + p for p in prompts)
+
+
+def main(refresh=False):
+    from strands import Agent
 
+    stdio_mcp_client = get_mcp_client(MCP_SERVER_PACKAGE, **MCP_SERVER_ENV)
+    model = get_bedrock_model(BEDROCK_MODEL_ID)
 
-def main():
     with stdio_mcp_client:
-        tools = stdio_mcp_client.list_tools_sync()
+        tools = cached_tools(stdio_mcp_client, 'aws-location', refresh)
         aws_location_agent = Agent(
             system_prompt = LOCATION_SYSTEM_PROMPT,
             model = model,
@@ -84,18 +60,21 @@ def main():
         print('AWS Location Agent Demo')
         print('-----------------------')
         print('\nExample prompts to try:')
-        print('\n'.join(['- ' + p for p in prompts]))
+        print(PROMPTS_BANNER)
         print("\nType 'exit' to quit.\n")
 
         while True:
-            user_input = input("Question: ")
+            user_input = ask("Question: ")
 
             if user_input.lower() in ["exit", "quit"]:
                 break
 
             print("\nThinking...\n")
             response = aws_location_agent(user_input)
-            print('\n' + '-' * 80 + '\n')
+            print(SEPARATOR)
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="AWS Location MCP Server Demo")
+    parser.add_argument("--refresh", action="store_true", help="List the MCP server tools again instead of using the cache")
+    args = parser.parse_args()
+    main(refresh=args.refresh)
@@ -1,57 +1,28 @@
 #!/usr/bin/env python
 
+import argparse
+import asyncio
 import logging
 import os
 import random
 
-from botocore.config import Config
-from mcp import stdio_client, StdioServerParameters
-from shutil import which
-
-from strands import Agent
-from strands.models.bedrock import BedrockModel
-from strands.tools.mcp.mcp_client import MCPClient
+from _common import cached_tools, get_bedrock_model, get_mcp_client, print_all, setup_logging
 
 # Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s | %(levelname)s | %(name)s | %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[logging.StreamHandler()]
-)
+setup_logging()
 logger = logging.getLogger(__name__)
-logging.getLogger("strands").setLevel(logging.INFO)
 
 HOME = os.getenv('HOME')
 BEDROCK_REGION = os.getenv("BEDROCK_REGION", 'us-west-2')
 BEDROCK_MODEL_ID = "us.amazon.nova-pro-v1:0"
 
-# AWS Cost Explorer MCP Server
-stdio_mcp_client = MCPClient(lambda: stdio_client(
-    StdioServerParameters(
-        command = which('uvx'),
-        args = [ 'awslabs.aws-pricing-mcp-server@latest' ],
-        env = {
-          "FASTMCP_LOG_LEVEL": "ERROR",
-          "AWS_PROFILE": "default",
-          "AWS_REGION": "us-east-1"
-        },
-        disabled = False,
-        autoApprove = []
-    )
-))
-
-# Initialize Strands Agent
-model = BedrockModel(
-    model_id = BEDROCK_MODEL_ID,
-    max_tokens = 2048,
-    boto_client_config = Config(
-        read_timeout = 120,
-        connect_timeout = 120,
-        retries = dict(max_attempts=3, mode="adaptive"),
-    ),
-    temperature = 0.1
-)
+# AWS Pricing MCP Server, started in main()
+MCP_SERVER_PACKAGE = 'awslabs.aws-pricing-mcp-server@latest'
+MCP_SERVER_ENV = {
+    "FASTMCP_LOG_LEVEL": "ERROR",
+    "AWS_PROFILE": "default",
+    "AWS_REGION": "us-east-1"
+}
 
 AWS_PRICING_SYSTEM_PROMPT = """You are an AWS pricing assistant with access to AWS Pricing tools.
 
@@ -68,20 +39,29 @@ prompts = [
     "What are the Lambda pricing tiers and costs?"
 ]
 
-def main():
+def main(refresh=False, use_cache=False):
+    from strands import Agent
+
+    stdio_mcp_client = get_mcp_client(MCP_SERVER_PACKAGE, **MCP_SERVER_ENV)
+    model = get_bedrock_model(BEDROCK_MODEL_ID)
+
     with stdio_mcp_client:
-        tools = stdio_mcp_client.list_tools_sync()
-        aws_pricing_agent = Agent(
-            system_prompt = AWS_PRICING_SYSTEM_PROMPT,
-            model = model,
-            tools = tools,
-            # callback_handler = None
-        )
+        tools = cached_tools(stdio_mcp_client, 'aws-pricing', refresh)
+
+        # One agent per prompt so the prompts can run concurrently
+        def make_agent():
+            return Agent(
+                system_prompt = AWS_PRICING_SYSTEM_PROMPT,
+                model = model,
+                tools = tools,
+                callback_handler = None
+            )
 
-        for prompt in prompts:
-            print(f'**Prompt**: {prompt}')
-            response = aws_pricing_agent(prompt)
-            print('\n' + '-' * 80 + '\n')
+        asyncio.run(print_all(make_agent, prompts, use_cache=use_cache))
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="AWS Pricing MCP Server Demo")
+    parser.add_argument("--refresh", action="store_true", help="List the MCP server tools again instead of using the cache")
+    parser.add_argument("--cache", action="store_true", help="Reuse responses to the same prompts from earlier today")
+    args = parser.parse_args()
+    main(refresh=args.refresh, use_cache=args.cache)
@@ -1,12 +1,83 @@
 import asyncio
+import json
 import os
 import sys
+import threading
+from collections import OrderedDict
 from contextlib import AsyncExitStack
-from typing import Any, List
+from functools import lru_cache
 
-import boto3
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+
+# System prompt sent with every converse call
+SYSTEM_PROMPT = """You are a helpful assistant with access to calculator and greeting tools. 
+When asked about calculations, use the calculator tools like add, subtract, multiply, and divide.
+When asked to greet someone, use the greet tool.
+When asked for a joke, use the tell_joke tool.
+Always include the full text of any joke or greeting in your response to make sure the user can see it.
+Respond in a friendly and helpful manner. Keep your answers brief but informative."""
+
+# Cache points mark the stable system prompt and tool schemas for Bedrock prompt caching
+CACHE_POINT = {"cachePoint": {"type": "default"}}
+SYSTEM = [{"text": SYSTEM_PROMPT}, CACHE_POINT]
+INFERENCE_CONFIG = {"temperature": 0.7}
+
+# Tools whose results depend only on their input, so repeated calls can be answered from memory
+CACHEABLE_TOOLS = {"add", "subtract", "multiply", "divide", "tell_joke", "greet"}
+TOOL_CACHE_SIZE = 256
+
+# Labels for tool results added to the answer when the model leaves them out
+RESULT_LABELS = {
+    "tell_joke": "Joke",
+    "greet": "Greeting",
+    **dict.fromkeys(("add", "subtract", "multiply", "divide"), "Calculation result"),
+}
+
+# Tool result types extract_tool_result passes through unchanged
+PLAIN_RESULT_TYPES = frozenset({str, int, float, bool, dict, list})
+
+
+@lru_cache(maxsize=None)
+def _get_bedrock_client(region: str):
+    """Return the Bedrock runtime client for a region, built from one shared session"""
+    import boto3
+    from botocore.config import Config
+
+    return boto3.Session().client(
+        "bedrock-runtime",
+        region_name=region,
+        config=Config(
+            connect_timeout=3,
+            read_timeout=60,
+            retries={"max_attempts": 3, "mode": "adaptive"},
+            tcp_keepalive=True,
+            max_pool_connections=32,
+        ),
+    )
+
+
+async def read_input(prompt: str) -> str:
+    """Read a line with input() on a daemon thread.
+
+    Unlike asyncio.to_thread, the thread is not joined at shutdown, so CTRL-C
+    at the prompt exits and stops the MCP server without waiting for Enter.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(setter, value):
+        if not future.done():
+            setter(value)
+
+    def read():
+        try:
+            line = input(prompt)
+        except BaseException as e:
+            loop.call_soon_threadsafe(resolve, future.set_exception, e)
+        else:
+            loop.call_soon_threadsafe(resolve, future.set_result, line)
+
+    threading.Thread(target=read, daemon=True).start()
+    return await future
 
 
 class HelloWorldBedrockAgent:
@@ -16,20 +87,28 @@ class HelloWorldBedrockAgent:
         self.exit_stack = AsyncExitStack()
         self.model_id = "us.anthropic.claude-3-5-haiku-20241022-v1:0"
         self.bedrock_runtime = None
+        self.tool_list = []
+        self.tool_config = {"tools": self.tool_list}
+        self._tool_cache = OrderedDict()
 
     async def connect_to_server(self, server_script_path: str):
         """Connect to an MCP server"""
+        from mcp import ClientSession, StdioServerParameters
+        from mcp.client.stdio import stdio_client
+
         if not server_script_path.endswith(".py"):
             raise ValueError("Server script must be a Python file with .py extension")
 
         print(f"Starting the MCP server: {server_script_path}...")
 
-        # Use environment variables for server process
+        # Use environment variables for server process, with unbuffered stdio
+        # so MCP messages are not held back in the server's output buffer
         env = os.environ.copy()
+        env["PYTHONUNBUFFERED"] = "1"
 
-        # Start the server as a subprocess
+        # Start the server as a subprocess with asserts compiled out
         server_params = StdioServerParameters(
-            command="python3", args=[server_script_path], env=env
+            command="python3", args=["-O", server_script_path], env=env
         )
 
         stdio_transport = await self.exit_stack.enter_async_context(
@@ -48,15 +127,26 @@ class HelloWorldBedrockAgent:
         print(
             "\nConnected to server with tools:", [tool.name for tool in response.tools]
         )
+
+        # Format tools for Bedrock once, ending with a cache point
+        self.tool_list = [
+            {
+                "toolSpec": {
+                    "name": tool.name,
+                    "description": tool.description,
+                    "inputSchema": {"json": tool.inputSchema},
+                }
+            }
+            for tool in response.tools
+        ] + [CACHE_POINT]
+        self.tool_config = {"tools": self.tool_list}
         return response.tools
 
     async def initialize_bedrock(self):
         """Initialize the Amazon Bedrock client"""
         print("Initializing Amazon Bedrock client...")
         try:
-            self.bedrock_runtime = boto3.client(
-                "bedrock-runtime", region_name="us-west-2"
-            )
+            self.bedrock_runtime = _get_bedrock_client("us-west-2")
             print(f"Using model: {self.model_id}")
             return True
         except Exception as e:
@@ -69,27 +159,25 @@ class HelloWorldBedrockAgent:
     def extract_tool_result(self, tool_result):
         """Extract content from a CallToolResult object or other result types"""
         try:
-            # If it's a string, number, bool, etc., return it directly
-            if isinstance(tool_result, (str, int, float, bool)):
+            # Plain values (str, numbers, bool, dict, list) are returned as is
+            if type(tool_result) in PLAIN_RESULT_TYPES:
                 return tool_result
 
             # If it has a content attribute (like CallToolResult)
-            if hasattr(tool_result, "content"):
-                content = tool_result.content
-
+            content = getattr(tool_result, "content", None)
+            if content is not None:
                 # If content is a list (like TextContent objects)
-                if isinstance(content, list) and content:
+                if type(content) is list and content:
                     # If the first item has a text attribute
-                    if hasattr(content[0], "text"):
-                        return content[0].text
+                    text = getattr(content[0], "text", None)
                     # Otherwise return the list
-                    return content
+                    return content if text is None else text
 
                 # For other content types
                 return str(content)
 
-            # If it's already a dict or list, return as is
-            if isinstance(tool_result, (dict, list)):
+            # Subclasses of the plain types are returned as is too
+            if isinstance(tool_result, tuple(PLAIN_RESULT_TYPES)):
                 return tool_result
 
             # Fallback to string representation
@@ -99,126 +187,188 @@ class HelloWorldBedrockAgent:
             print(f"Error extracting tool result: {e}")
             return str(tool_result)
 
-    async def process_query(self, query: str, available_tools: List[Any]):
+    def _cached_result(self, tool_name: str, tool_input: dict):
+        """Return the remembered result of a pure tool call, or None"""
+        if tool_name not in CACHEABLE_TOOLS:
+            return None
+        key = (tool_name, json.dumps(tool_input, sort_keys=True))
+        if key in self._tool_cache:
+            self._tool_cache.move_to_end(key)
+            return self._tool_cache[key]
+        return None
+
+    def _store_result(self, tool_name: str, tool_input: dict, result):
+        """Remember the result of a pure tool call and return it"""
+        if tool_name in CACHEABLE_TOOLS:
+            self._tool_cache[(tool_name, json.dumps(tool_input, sort_keys=True))] = result
+            if len(self._tool_cache) > TOOL_CACHE_SIZE:
+                self._tool_cache.popitem(last=False)
+        return result
+
+    async def call_tool(self, tool_name: str, tool_input: dict):
+        """Call a tool through the MCP session, reusing earlier results of pure tools"""
+        result = self._cached_result(tool_name, tool_input)
+        if result is None:
+            result = self._store_result(
+                tool_name, tool_input, await self.session.call_tool(tool_name, tool_input)
+            )
+        return result
+
+    async def converse_stream(self, messages, on_tool_use):
+        """Stream a converse call, passing each toolUse block to on_tool_use as soon as it is complete
+
+        Returns:
+            The assembled assistant message
+        """
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+
+        # The boto3 event stream blocks, so it is read in a thread and handed to the loop
+        def read_events():
+            try:
+                response = self.bedrock_runtime.converse_stream(
+                    modelId=self.model_id,
+                    messages=messages,
+                    inferenceConfig=INFERENCE_CONFIG,
+                    toolConfig=self.tool_config,
+                    system=SYSTEM,
+                )
+                for event in response["stream"]:
+                    loop.call_soon_threadsafe(events.put_nowait, event)
+            except Exception as e:
+                loop.call_soon_threadsafe(events.put_nowait, e)
+            else:
+                loop.call_soon_threadsafe(events.put_nowait, None)
+
+        reader = asyncio.create_task(asyncio.to_thread(read_events))
+        blocks = {}
+        while (event := await events.get()) is not None:
+            if isinstance(event, Exception):
+                raise event
+
+            if "contentBlockStart" in event:
+                start = event["contentBlockStart"]
+                tool_use = start["start"].get("toolUse")
+                if tool_use:
+                    blocks[start["contentBlockIndex"]] = {
+                        "toolUse": {
+                            "toolUseId": tool_use["toolUseId"],
+                            "name": tool_use["name"],
+                            "input": "",
+                        }
+                    }
+
+            elif "contentBlockDelta" in event:
+                delta = event["contentBlockDelta"]["delta"]
+                index = event["contentBlockDelta"]["contentBlockIndex"]
+                if "text" in delta:
+                    block = blocks.setdefault(index, {"text": ""})
+                    block["text"] += delta["text"]
+                elif "toolUse" in delta:
+                    blocks[index]["toolUse"]["input"] += delta["toolUse"]["input"]
+
+            elif "contentBlockStop" in event:
+                block = blocks.get(event["contentBlockStop"]["contentBlockIndex"], {})
+                if "toolUse" in block:
+                    tool_use = block["toolUse"]
+                    tool_use["input"] = json.loads(tool_use["input"] or "{}")
+                    on_tool_use(tool_use)
+
+        await reader
+        return {"role": "assistant", "content": [blocks[i] for i in sorted(blocks)]}
+
+    async def process_query(self, query: str):
         """Process a user query using Bedrock and the MCP tools"""
         if not self.bedrock_runtime:
             return "Bedrock client not initialized"
 
-        # Format tools for Bedrock
-        tool_list = [
-            {
-                "toolSpec": {
-                    "name": tool.name,
-                    "description": tool.description,
-                    "inputSchema": {"json": tool.inputSchema},
-                }
-            }
-            for tool in available_tools
-        ]
-
-        # Create the system message
-        system_prompt = """You are a helpful assistant with access to calculator and greeting tools. 
-When asked about calculations, use the calculator tools like add, subtract, multiply, and divide.
-When asked to greet someone, use the greet tool.
-When asked for a joke, use the tell_joke tool.
-Always include the full text of any joke or greeting in your response to make sure the user can see it.
-Respond in a friendly and helpful manner. Keep your answers brief but informative."""
-
         # Initialize messages array - exactly like in nova_act_mcp_client.py
         messages = [{"role": "user", "content": [{"text": query}]}]
 
+        tool_tasks = []
         try:
-            # Call Amazon Bedrock with the user query - exactly like in nova_act_mcp_client.py
-            print("Sending query to Bedrock...")
-            response = self.bedrock_runtime.converse(
-                modelId=self.model_id,
-                messages=messages,
-                inferenceConfig={"temperature": 0.7},
-                toolConfig={"tools": tool_list},
-                system=[{"text": system_prompt}],
-            )
-
-            # Extract the assistant's response - exactly like in nova_act_mcp_client.py
-            response_message = response["output"]["message"]
             final_responses = []
             tool_results = {}
+            tool_uses = []
+
+            # Start each tool call as soon as its toolUse block has streamed in,
+            # while the model is still generating the rest of the response
+            def start_tool(tool_use):
+                print(f"Calling tool: {tool_use['name']} with input: {tool_use['input']}")
+                tool_uses.append(tool_use)
+                tool_tasks.append(
+                    asyncio.create_task(self.call_tool(tool_use["name"], tool_use["input"]))
+                )
+
+            # Call Amazon Bedrock with the user query
+            print("Sending query to Bedrock...")
+            response_message = await self.converse_stream(messages, start_tool)
 
-            # Process each content block in the response - exactly like in nova_act_mcp_client.py
+            # Process each content block in the response
             for content_block in response_message["content"]:
                 if "text" in content_block:
                     # Add text responses to our final output
                     final_responses.append(content_block["text"])
 
                 elif "toolUse" in content_block:
-                    # Handle tool usage
-                    tool_use = content_block["toolUse"]
-                    tool_name = tool_use["name"]
-                    tool_input = tool_use["input"]
-                    tool_use_id = tool_use["toolUseId"]
-
-                    print(f"Calling tool: {tool_name} with input: {tool_input}")
-                    final_responses.append(f"[Calling tool {tool_name}]")
-
-                    # Call the tool through MCP session
-                    raw_tool_result = await self.session.call_tool(
-                        tool_name, tool_input
-                    )
+                    final_responses.append(f"[Calling tool {content_block['toolUse']['name']}]")
+
+            if tool_uses:
+                # Wait for the tool calls started during the stream
+                raw_tool_results = await asyncio.gather(*tool_tasks)
 
+                tool_result_blocks = []
+                for tool_use, raw_tool_result in zip(tool_uses, raw_tool_results):
                     # Extract the actual content from the tool result
                     extracted_result = self.extract_tool_result(raw_tool_result)
                     print(f"Raw tool result type: {type(raw_tool_result)}")
                     print(f"Extracted result: {extracted_result}")
 
                     # Save the result for later display
-                    tool_results[tool_name] = extracted_result
-
-                    # Create follow-up message with tool result
-                    tool_result_message = {
-                        "role": "user",
-                        "content": [
-                            {
-                                "toolResult": {
-                                    "toolUseId": tool_use_id,
-                                    "content": [{"json": {"result": extracted_result}}],
-                                }
-                            }
-                        ],
-                    }
+                    tool_results[tool_use["name"]] = extracted_result
 
-                    # Add the AI message and tool result to messages
-                    messages.append(response_message)
-                    messages.append(tool_result_message)
-
-                    # Make another call to get the final response
-                    follow_up_response = self.bedrock_runtime.converse(
-                        modelId=self.model_id,
-                        messages=messages,
-                        inferenceConfig={"temperature": 0.7},
-                        toolConfig={"tools": tool_list},
-                        system=[{"text": system_prompt}],
+                    tool_result_blocks.append(
+                        {
+                            "toolResult": {
+                                "toolUseId": tool_use["toolUseId"],
+                                "content": [{"json": {"result": extracted_result}}],
+                            }
+                        }
                     )
 
-                    # Add the follow-up response to our final output
-                    follow_up_text = follow_up_response["output"]["message"]["content"][
-                        0
-                    ]["text"]
-                    final_responses.append(follow_up_text)
+                # Add the AI message and all the tool results to messages
+                messages.append(response_message)
+                messages.append({"role": "user", "content": tool_result_blocks})
+
+                # Make one more call to get the final response
+                follow_up_response = await asyncio.to_thread(
+                    self.bedrock_runtime.converse,
+                    modelId=self.model_id,
+                    messages=messages,
+                    inferenceConfig=INFERENCE_CONFIG,
+                    toolConfig=self.tool_config,
+                    system=SYSTEM,
+                )
+
+                # Add the follow-up response to our final output
+                follow_up_text = follow_up_response["output"]["message"]["content"][0][
+                    "text"
+                ]
+                final_responses.append(follow_up_text)
 
             # Compose the final response with explicit tool results
             final_text = "\n".join(final_responses)
 
             # If we have tool results but they're not obviously included in the response,
             # add them explicitly
+            extras = {}
             for tool_name, result in tool_results.items():
-                if tool_name == "tell_joke" and result not in final_text:
-                    final_text += f"\n\nJoke: {result}"
-                elif tool_name == "greet" and result not in final_text:
-                    final_text += f"\n\nGreeting: {result}"
-                elif (
-                    tool_name in ["add", "subtract", "multiply", "divide"]
-                    and str(result) not in final_text
-                ):
-                    final_text += f"\n\nCalculation result: {result}"
+                label = RESULT_LABELS.get(tool_name)
+                text = str(result)
+                if label and text not in extras and text not in final_text:
+                    extras[text] = f"{label}: {result}"
+            if extras:
+                final_text += "\n\n" + "\n\n".join(extras.values())
 
             return final_text
 
@@ -229,21 +379,28 @@ Respond in a friendly and helpful manner. Keep your answers brief but informativ
             traceback.print_exc()
             return f"Error: {str(e)}"
 
-    async def chat_loop(self, available_tools: List[Any]):
+        finally:
+            # Don't leave tool calls running if the turn failed or was cancelled
+            for task in tool_tasks:
+                task.cancel()
+
+    async def chat_loop(self):
         """Run an interactive chat loop"""
         print("\nYou can now chat with the agent. Type 'exit' to quit.")
 
         while True:
             try:
-                # Get user input
-                user_query = input("\nYou: ")
+                # Get user input in a thread so the MCP transport keeps being serviced
+                user_query = await read_input("\nYou: ")
                 if user_query.lower() in ["exit", "quit"]:
                     break
 
                 # Process the query
-                response = await self.process_query(user_query, available_tools)
+                response = await self.process_query(user_query)
                 print("\nAssistant:", response)
 
+            except EOFError:
+                break
             except Exception as e:
                 print(f"\nError: {str(e)}")
 
@@ -263,13 +420,13 @@ async def main():
     agent = HelloWorldBedrockAgent()
 
     try:
-        # Connect to the MCP server and get available tools
-        available_tools = await agent.connect_to_server(server_script_path)
+        # Connect to the MCP server
+        await agent.connect_to_server(server_script_path)
 
         # Initialize the Bedrock client
         if await agent.initialize_bedrock():
             # Run the chat loop
-            await agent.chat_loop(available_tools)
+            await agent.chat_loop()
     except Exception as e:
         print(f"Error: {str(e)}")
     finally:
@@ -3,10 +3,12 @@ from mcp.server.fastmcp import FastMCP
 # Initialize FastMCP server
 mcp = FastMCP("hello-world-server")
 
+JOKE = "Why do programmers prefer dark mode? Because light attracts bugs!"
+
 
 # Define tools
 @mcp.tool()
-async def greet(name: str) -> str:
+def greet(name: str) -> str:
     """Greet a person with their name.
 
     Parameters:
@@ -19,7 +21,7 @@ async def greet(name: str) -> str:
 
 
 @mcp.tool()
-async def add(a: float, b: float) -> float:
+def add(a: float, b: float) -> float:
     """Add two numbers together.
 
     Parameters:
@@ -33,7 +35,7 @@ async def add(a: float, b: float) -> float:
 
 
 @mcp.tool()
-async def subtract(a: float, b: float) -> float:
+def subtract(a: float, b: float) -> float:
     """Subtract the second number from the first.
 
     Parameters:
@@ -47,7 +49,7 @@ async def subtract(a: float, b: float) -> float:
 
 
 @mcp.tool()
-async def multiply(a: float, b: float) -> float:
+def multiply(a: float, b: float) -> float:
     """Multiply two numbers together.
 
     Parameters:
@@ -61,7 +63,7 @@ async def multiply(a: float, b: float) -> float:
 
 
 @mcp.tool()
-async def divide(a: float, b: float) -> float:
+def divide(a: float, b: float) -> float:
     """Divide the first number by the second.
 
     Parameters:
@@ -77,13 +79,13 @@ async def divide(a: float, b: float) -> float:
 
 
 @mcp.tool()
-async def tell_joke() -> str:
+def tell_joke() -> str:
     """Tell a programming joke.
 
     Returns:
         A programming joke
     """
-    return "Why do programmers prefer dark mode? Because light attracts bugs!"
+    return JOKE
 
 
 # Run the server
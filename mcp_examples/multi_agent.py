@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+
+"""
+Runs cost explorer, pricing and documentation prompts through a single agent.
+
+The three MCP servers are started once and their tools are merged, so the agent
+can pick whichever tool a prompt needs without one uvx subprocess per demo.
+"""
+
+import argparse
+import logging
+
+from _common import SEPARATOR, cached_tools, get_bedrock_model, get_mcp_client, multi_mcp, setup_logging
+
+import aws_cost_explorer_agent as cost_explorer
+import aws_documentation_agent as documentation
+import aws_pricing_agent as pricing
+
+# Set up logging
+setup_logging()
+logger = logging.getLogger(__name__)
+
+BEDROCK_MODEL_ID = "us.amazon.nova-pro-v1:0"
+
+MULTI_AGENT_SYSTEM_PROMPT = """You are an AWS assistant with access to AWS Cost Explorer, AWS Pricing and AWS Documentation tools.
+
+Use the available tools to:
+- Query and analyze AWS costs across services, regions and time periods
+- Get current AWS service pricing and compare it across regions and tiers
+- Search and read official AWS documentation
+
+Provide accurate answers based on the data returned by the tools."""
+
+def main(refresh=False):
+    from strands import Agent
+
+    servers = {
+        'cost-explorer': cost_explorer,
+        'aws-pricing': pricing,
+        'aws-documentation': documentation,
+    }
+    clients = {
+        name: get_mcp_client(module.MCP_SERVER_PACKAGE, **module.MCP_SERVER_ENV)
+        for name, module in servers.items()
+    }
+    model = get_bedrock_model(BEDROCK_MODEL_ID)
+
+    prompts = [
+        cost_explorer.pick_prompts(k=1)[0],
+        pricing.prompts[0],
+        documentation.prompts[0],
+    ]
+
+    with multi_mcp(clients.values()):
+        tools = [ tool for name, client in clients.items() for tool in cached_tools(client, name, refresh) ]
+        aws_agent = Agent(
+            system_prompt = MULTI_AGENT_SYSTEM_PROMPT,
+            model = model,
+            tools = tools,
+        )
+
+        for prompt in prompts:
+            print(f'**Prompt**: {prompt}')
+            response = aws_agent(prompt)
+            print(SEPARATOR)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="AWS Cost Explorer, Pricing and Documentation MCP Servers Demo")
+    parser.add_argument("--refresh", action="store_true", help="List the MCP server tools again instead of using the cache")
+    args = parser.parse_args()
+    main(refresh=args.refresh)
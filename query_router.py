@@ -0,0 +1,72 @@
+"""
+Keyword-based routing for the TeachAssist Streamlit apps.
+
+Most queries can be routed by a handful of regular expressions, which saves a
+full Bedrock round-trip per turn. Each router returns None when the keyword
+evidence is ambiguous so the caller can fall back to its LLM classifier.
+"""
+
+import re
+
+# Phrases pointing at the user's own stored information
+PERSONAL_PATTERN = re.compile(
+    r"\b(remember|my|mine|myself|about me|who am i|where do i|i live|i am|i'm|favou?rite)\b",
+    re.IGNORECASE,
+)
+
+# Phrases pointing at an educational question for the teacher agent
+EDUCATIONAL_PATTERN = re.compile(
+    r"\b(solve|calculate|compute|equation|formula|explain|translate|translation|grammar|essay|poem|"
+    r"literature|code|program|programming|algorithm|python|java|define|what is the|what are the)\b"
+    r"|\d\s*[-+*/^=]\s*\d",
+    re.IGNORECASE,
+)
+
+# Verbs asking for something to be written to the knowledge base
+STORE_PATTERN = re.compile(
+    r"\b(remember|store|save|note|keep in mind|don't forget)\b|^\s*(my|i|i'm|i am)\b",
+    re.IGNORECASE,
+)
+
+# Interrogatives asking for something to be read back from the knowledge base
+RETRIEVE_PATTERN = re.compile(
+    r"^\s*(what|what's|whats|where|who|when|which|how|do|does|did|is|am|are|can|tell me|show me|give me|list|recall)\b"
+    r"|\?\s*$",
+    re.IGNORECASE,
+)
+
+# Requests for everything remembered about the user, answered by listing memories
+LIST_MEMORIES_PATTERN = re.compile(
+    r"\b(list|show)\b.*\b(all|every)\b.*\b(memories|memory|information|facts)\b"
+    r"|\bwhat do you (know|remember) about me\b",
+    re.IGNORECASE,
+)
+
+
+def route_query(query):
+    """Return "teacher" or "knowledgebase" when the keywords clearly favour one, else None."""
+    personal = len(PERSONAL_PATTERN.findall(query))
+    educational = len(EDUCATIONAL_PATTERN.findall(query))
+
+    if personal > educational:
+        return "knowledgebase"
+    if educational > personal:
+        return "teacher"
+    return None
+
+
+def route_kb_action(query):
+    """Return "store" or "retrieve" when only one kind of keyword matches, else None."""
+    store = STORE_PATTERN.search(query) is not None
+    retrieve = RETRIEVE_PATTERN.search(query) is not None
+
+    if store and not retrieve:
+        return "store"
+    if retrieve and not store:
+        return "retrieve"
+    return None
+
+
+def wants_memory_list(query):
+    """Return True when the query asks for everything remembered about the user."""
+    return LIST_MEMORIES_PATTERN.search(query) is not None
@@ -35,9 +35,12 @@ python mem0_agent.py
    - "What memories do you have stored?"
 """
 
+import json
 import os
+from botocore.config import Config
 from strands import Agent
 from strands.models import BedrockModel
+from strands.tools.tools import PythonAgentTool
 from strands_tools import mem0_memory, use_llm
 
 USER_ID = os.getenv('USER_ID', 'Alex')
@@ -46,31 +49,69 @@ SYSTEM_PROMPT = """
 You remember user preferences.
 """
 
+DEMO_FACTS = [
+    f"My name is {USER_ID}.",
+    "I like to travel and stay in Airbnbs rather than hotels.",
+    "I am planning a trip to Japan next spring.",
+    "I enjoy hiking and outdoor photography as hobbies.",
+    "I have a dog named Max.",
+    "My favorite cuisine is Italian food.",
+]
+
 # Setup
-def initialize_demo_memories(memory_agent) -> None:
-    init_memories = f"My name is {USER_ID}. I like to travel and stay in Airbnbs rather than hotels. I am planning a trip to Japan next spring. I enjoy hiking and outdoor photography as hobbies. I have a dog named Max. My favorite cuisine is Italian food."
+def initialize_demo_memories(memory_agent, facts=DEMO_FACTS) -> None:
+    """Store all the facts with a single mem0 write."""
     memory_agent.tool.mem0_memory(
         action = "store",
-        content = init_memories,
+        content = " ".join(facts),
         user_id = USER_ID
     )
 
 bedrock_model = BedrockModel(
     model_id="anthropic.claude-3-5-sonnet-20241022-v2:0",  # "us.amazon.nova-pro-v1:0"
     temperature=0.1,
+    boto_client_config=Config(
+        max_pool_connections=32,
+        tcp_keepalive=True,
+        retries={"max_attempts": 3, "mode": "adaptive"},
+    ),
 )
 
+# mem0 reads repeated within one agent turn are answered from this cache;
+# it is emptied at the start of each turn and by any write
+MEMORY_READ_ACTIONS = {"retrieve", "list", "get"}
+memory_cache = {}
+
+def cached_mem0_memory(tool, **kwargs):
+    """Run mem0_memory, reusing identical successful reads from the current turn."""
+    tool_input = tool["input"]
+    if tool_input.get("action") not in MEMORY_READ_ACTIONS:
+        memory_cache.clear()
+        return mem0_memory.mem0_memory(tool, **kwargs)
+
+    key = json.dumps(tool_input, sort_keys=True)
+    if key not in memory_cache:
+        result = mem0_memory.mem0_memory(tool, **kwargs)
+        if result.get("status") != "success":
+            return result
+        memory_cache[key] = result
+    return {**memory_cache[key], "toolUseId": tool["toolUseId"]}
+
 memory_agent = Agent(
    model=bedrock_model,  # Remove this line to use default model
    system_prompt=SYSTEM_PROMPT,
-   tools=[mem0_memory, use_llm],
+   tools=[PythonAgentTool("mem0_memory", mem0_memory.TOOL_SPEC, cached_mem0_memory), use_llm],
 )
 
+def ask(prompt):
+   """Run one agent turn for USER_ID with a fresh memory read cache."""
+   memory_cache.clear()
+   return memory_agent(prompt, user_id=USER_ID)
+
 def demo():
    initialize_demo_memories(memory_agent)
-   memory_agent("I work in marketing.", user_id=USER_ID)
-   memory_agent("I am 32 years old.", user_id=USER_ID)
-   memory_agent("What do you remember about me?", user_id=USER_ID)
+   ask("I work in marketing. I am 32 years old.")
+   ask("What do you remember about me?")
    print()
 
 # Example usage
@@ -100,7 +141,7 @@ if __name__ == "__main__":
                 break
 
             # Call the memory agent
-            memory_agent(user_input, user_id=USER_ID)
+            ask(user_input)
 
         except KeyboardInterrupt:
             print("\n\nExecution interrupted. Exiting...")
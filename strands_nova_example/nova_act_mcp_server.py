@@ -11,6 +11,12 @@ from typing import Any, Dict, List, Optional
 from mcp.server.fastmcp import FastMCP
 from nova_act import ActError, NovaAct
 
+# orjson reads and writes the task result files faster when it is installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Initialize FastMCP server
 mcp = FastMCP("nova-act-server")
 
@@ -22,6 +28,48 @@ results_lock = threading.Lock()
 
 
 # Helper functions
+def write_json(file_path: str, data) -> None:
+    """Write data to a JSON file, with orjson if available"""
+    if orjson:
+        with open(file_path, "wb") as f:
+            f.write(orjson.dumps(data))
+    else:
+        with open(file_path, "w") as f:
+            json.dump(data, f)
+
+
+def read_json(file_path: str):
+    """Read a JSON file, with orjson if available"""
+    if orjson:
+        with open(file_path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(file_path, "r") as f:
+        return json.load(f)
+
+
+def act_result_fields(result) -> Dict[str, Any]:
+    """Return the response fields of a Nova Act result; older results lack some of them"""
+    return {
+        "response": result.response,
+        "parsed_response": getattr(result, "parsed_response", None),
+        "valid_json": getattr(result, "valid_json", None),
+        "matches_schema": getattr(result, "matches_schema", None),
+    }
+
+
+def act_result_metadata(result) -> Dict[str, Any]:
+    """Return a Nova Act result's metadata as JSON-serializable values"""
+    metadata = getattr(result, "metadata", None)
+    if metadata is None:
+        return {}
+    return {
+        "num_steps_executed": metadata.num_steps_executed,
+        "start_time": str(metadata.start_time),
+        "end_time": str(metadata.end_time),
+        "prompt": str(metadata.prompt),
+    }
+
+
 def generate_id(prefix: str) -> str:
     """Generate a unique ID for results"""
     import uuid
@@ -99,30 +147,8 @@ def execute_nova_act_task(task_args, result_file=None):
                         "action": action_text,
                         "starting_page": starting_page,
                         "final_page": nova_act.page.url,
-                        "response": result.response,
-                        "parsed_response": (
-                            result.parsed_response
-                            if hasattr(result, "parsed_response")
-                            else None
-                        ),
-                        "valid_json": (
-                            result.valid_json if hasattr(result, "valid_json") else None
-                        ),
-                        "matches_schema": (
-                            result.matches_schema
-                            if hasattr(result, "matches_schema")
-                            else None
-                        ),
-                        "metadata": (
-                            {
-                                "num_steps_executed": result.metadata.num_steps_executed,
-                                "start_time": str(result.metadata.start_time),
-                                "end_time": str(result.metadata.end_time),
-                                "prompt": str(result.metadata.prompt),
-                            }
-                            if hasattr(result, "metadata")
-                            else {}
-                        ),
+                        **act_result_fields(result),
+                        "metadata": act_result_metadata(result),
                     }
 
                     task_results.append(result_data)
@@ -131,8 +157,7 @@ def execute_nova_act_task(task_args, result_file=None):
 
         # Write results to file if specified
         if result_file:
-            with open(result_file, "w") as f:
-                json.dump({"starting_page": starting_page, "results": task_results}, f)
+            write_json(result_file, {"starting_page": starting_page, "results": task_results})
 
         return {"starting_page": starting_page, "results": task_results}
     except Exception as e:
@@ -142,8 +167,7 @@ def execute_nova_act_task(task_args, result_file=None):
             "results": task_results,
         }
         if result_file:
-            with open(result_file, "w") as f:
-                json.dump(result, f)
+            write_json(result_file, result)
         return result
 
 
@@ -231,66 +255,22 @@ async def browser_session(
 
                         # Store the result
                         result_id = generate_id("result")
-                        result_data = {
+                        result_item = {
                             "result_id": result_id,
                             "action": action_text,
                             "starting_page": starting_page,
                             "final_page": nova_act.page.url,
-                            "response": result.response,
-                            "parsed_response": (
-                                result.parsed_response
-                                if hasattr(result, "parsed_response")
-                                else None
-                            ),
-                            "valid_json": (
-                                result.valid_json
-                                if hasattr(result, "valid_json")
-                                else None
-                            ),
-                            "matches_schema": (
-                                result.matches_schema
-                                if hasattr(result, "matches_schema")
-                                else None
-                            ),
-                            "metadata": (
-                                {
-                                    "num_steps_executed": result.metadata.num_steps_executed,
-                                    "start_time": str(result.metadata.start_time),
-                                    "end_time": str(result.metadata.end_time),
-                                    "prompt": str(result.metadata.prompt),
-                                }
-                                if hasattr(result, "metadata")
-                                else {}
-                            ),
+                            **act_result_fields(result),
+                        }
+                        result_data = {
+                            **result_item,
+                            "metadata": act_result_metadata(result),
                         }
 
                         with results_lock:
                             results_store[result_id] = result_data
 
                         # Store action result
-                        result_item = {
-                            "result_id": result_id,
-                            "action": action_text,
-                            "starting_page": starting_page,
-                            "final_page": nova_act.page.url,
-                            "response": result.response,
-                            "parsed_response": (
-                                result.parsed_response
-                                if hasattr(result, "parsed_response")
-                                else None
-                            ),
-                            "valid_json": (
-                                result.valid_json
-                                if hasattr(result, "valid_json")
-                                else None
-                            ),
-                            "matches_schema": (
-                                result.matches_schema
-                                if hasattr(result, "matches_schema")
-                                else None
-                            ),
-                        }
-
                         results.append(result_item)
 
                         # If this is the last action, it usually contains the data we want
@@ -355,53 +335,21 @@ async def browser_action(
 
             # Store the result
             result_id = generate_id("result")
-            result_data = {
+            result_item = {
                 "result_id": result_id,
-                "action": action,
                 "final_page": act.page.url,
-                "response": result.response,
-                "parsed_response": (
-                    result.parsed_response
-                    if hasattr(result, "parsed_response")
-                    else None
-                ),
-                "valid_json": (
-                    result.valid_json if hasattr(result, "valid_json") else None
-                ),
-                "matches_schema": (
-                    result.matches_schema if hasattr(result, "matches_schema") else None
-                ),
-                "metadata": (
-                    {
-                        "num_steps_executed": result.metadata.num_steps_executed,
-                        "start_time": result.metadata.start_time,
-                        "end_time": result.metadata.end_time,
-                        "prompt": result.metadata.prompt,
-                    }
-                    if hasattr(result, "metadata")
-                    else {}
-                ),
+                **act_result_fields(result),
+            }
+            result_data = {
+                **result_item,
+                "action": action,
+                "metadata": act_result_metadata(result),
             }
 
             with results_lock:
                 results_store[result_id] = result_data
 
-            return {
-                "result_id": result_id,
-                "final_page": act.page.url,
-                "response": result.response,
-                "parsed_response": (
-                    result.parsed_response
-                    if hasattr(result, "parsed_response")
-                    else None
-                ),
-                "valid_json": (
-                    result.valid_json if hasattr(result, "valid_json") else None
-                ),
-                "matches_schema": (
-                    result.matches_schema if hasattr(result, "matches_schema") else None
-                ),
-            }
+            return result_item
         except Exception as e:
             print(f"Error executing action: {e}")
             raise
@@ -479,9 +427,8 @@ async def execute_parallel_browser_tasks(
         processes.append(process)
         process.start()
 
-    # Wait for all processes to complete
-    for process in processes:
-        process.join()
+    # Wait for all processes to complete without blocking the server's event loop
+    await asyncio.gather(*[asyncio.to_thread(process.join) for process in processes])
 
     # Collect results
     all_results = []
@@ -489,8 +436,7 @@ async def execute_parallel_browser_tasks(
     for result_file in result_files:
         try:
             if os.path.exists(result_file):
-                with open(result_file, "r") as f:
-                    task_result = json.load(f)
+                task_result = read_json(result_file)
 
                 # Process the task result to add final_result and collected_data
                 if "results" in task_result and task_result["results"]:
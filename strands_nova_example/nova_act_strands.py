@@ -1,6 +1,9 @@
+import atexit
 import os
 import shutil
+from functools import lru_cache
 
+from botocore.config import Config
 from mcp import StdioServerParameters, stdio_client
 from strands import Agent
 from strands.models import BedrockModel
@@ -31,12 +34,38 @@ nova_act_client = MCPClient(
 bedrock_model = BedrockModel(
     model_id="us.anthropic.claude-3-5-haiku-20241022-v1:0",
     temperature=0.7,
+    boto_client_config=Config(
+        max_pool_connections=32,
+        tcp_keepalive=True,
+        retries={"max_attempts": 3, "mode": "adaptive"},
+    ),
 )
 
-with nova_act_client:
-    agent = Agent(
-        tools=nova_act_client.list_tools_sync(),
+
+@lru_cache(maxsize=None)
+def get_agent() -> Agent:
+    """Return the shared agent, starting the Nova Act MCP server on first use.
+
+    The server stays up for later prompts and is stopped at exit.
+    """
+    nova_act_client.__enter__()
+    try:
+        tools = nova_act_client.list_tools_sync()
+    except BaseException:
+        # lru_cache does not keep failures, so stop the server before the next call starts it again
+        nova_act_client.__exit__(None, None, None)
+        raise
+    atexit.register(nova_act_client.__exit__, None, None, None)
+    return Agent(
+        tools=tools,
         model=bedrock_model,
     )
 
-    response = agent("Find the first backpack on amazon.com use headless mode")
+
+def run(prompt: str):
+    """Send a prompt to the shared agent"""
+    return get_agent()(prompt)
+
+
+if __name__ == "__main__":
+    response = run("Find the first backpack on amazon.com use headless mode")
@@ -6,11 +6,15 @@
 import chainlit as cl
 import logging
 import os
+import sys
 
 from botocore.config import Config
+from collections import deque
 
 from nea_agent import nea_agent as agent
+from nea_agent import get_nea_2hr, get_nea_24hr, get_nea_4day
 from strands import Agent
+from strands.agent.conversation_manager import SlidingWindowConversationManager
 from strands.handlers.callback_handler import PrintingCallbackHandler
 from strands.models.bedrock import BedrockModel
 
@@ -54,32 +58,48 @@ prompts = [
     "How's the weather looking for the weekend?"
 ]
 
+# Starters and welcome message are built once at import, not on every new chat
+STARTERS = [
+    cl.Starter(
+        label = f'{prompt[:80]}...',
+        message = prompt,
+    )
+    for prompt in prompts
+]
+# Keep only the most recent messages of each session's conversation, so
+# long-lived sessions do not grow the prompt without bound
+MAX_HISTORY = 40
+WELCOME_MESSAGE = "Welcome to the Chainlit + Strands chat app! How can I help you today?"
+
 # Set up Chainlit
 @cl.set_starters
 async def set_starters():
     """Chat starter suggestions!"""
-    starter_prompts = []
-    for prompt in prompts:
-        starter_prompts.append(
-            cl.Starter(
-                label = f'{prompt[:80]}...',
-                message = f'{prompt}',
-            )
-        )
-    return starter_prompts
+    return STARTERS
+
+def create_session_agent():
+    """Return a new agent for one chat session, sharing the example agent's model, prompt and tools."""
+    return Agent(
+        model = agent.model,
+        system_prompt = agent.system_prompt,
+        tools = [ get_nea_2hr, get_nea_24hr, get_nea_4day ],
+        callback_handler = None,
+        conversation_manager = SlidingWindowConversationManager(window_size=MAX_HISTORY),
+    )
 
 @cl.on_chat_start
 async def on_chat_start():
-    welcome_message = "Welcome to the Chainlit + Strands chat app! How can I help you today?"
+    # Each session gets its own conversation instead of sharing the module-level agent's
+    cl.user_session.set("agent", create_session_agent())
     cl.user_session.set(
         "message_history",
-        [{"role": "system", "content": welcome_message}],
+        deque([{"role": "system", "content": WELCOME_MESSAGE}], maxlen=MAX_HISTORY),
     )
 
 @cl.on_message
 async def on_message(message: cl.Message):
-    # Invoke agent
-    agent_stream = agent.stream_async(
+    # Invoke this session's agent
+    agent_stream = cl.user_session.get('agent').stream_async(
         message.content
     )
 
@@ -92,13 +112,14 @@ async def on_message(message: cl.Message):
     async for event in agent_stream:
         if 'data' in event:
             text_chunk = event["data"]
-            print(text_chunk, end="", flush=True)  # Print chunks as they're generated
+            print(text_chunk, end="", flush='\n' in text_chunk)  # Mirror to the console, flushing once per line
             await msg.stream_token(text_chunk)     # Output to Chainlit UI
         elif "current_tool_use" in event and event["current_tool_use"].get("name"):
             # Print tool usage information
             tool_use_chunk = f"\n[Tool use delta for: {event['current_tool_use']['name']}]"
-            print(tool_use_chunk)
-            await msg.stream_token(tool_use_chunk)  
+            print(tool_use_chunk, flush=True)
+            await msg.stream_token(tool_use_chunk)
+    sys.stdout.flush()
 
 @cl.on_stop
 async def on_stop():
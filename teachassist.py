@@ -0,0 +1,479 @@
+"""
+Agents and chat helpers shared by the TeachAssist Streamlit apps.
+
+Models and the background store executor are st.cache_resource singletons,
+shared by every session in the process. Agents hold a conversation, so they
+live in st.session_state along with the response and retrieval caches and
+pending knowledge base writes.
+"""
+
+import asyncio
+import boto3
+import functools
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+from botocore.config import Config
+from strands import Agent
+from strands.models import BedrockModel
+from strands.tools.executors import ConcurrentToolExecutor
+from strands_tools import memory
+
+from prompts import (
+    ACTION_SYSTEM_PROMPT,
+    ANSWER_SYSTEM_PROMPT,
+    KB_ACTION_SYSTEM_PROMPT,
+    KB_COMBINED_SYSTEM_PROMPT,
+    TEACHER_SYSTEM_PROMPT,
+)
+from query_router import route_kb_action, route_query
+
+# Maximum number of LLM responses kept in each session's cache
+LLM_CACHE_SIZE = 256
+
+# Knowledge base retrieval limits - only the best few records reach the synthesis prompt
+KB_MIN_SCORE = 0.4
+KB_MAX_RESULTS = 3
+
+# Seconds a retrieved result is reused for a repeated query
+RETRIEVE_CACHE_TTL = 60
+
+# Small, fast model used by default for the one-word classifier calls
+CLASSIFIER_MODEL_ID = "us.amazon.nova-micro-v1:0"
+
+# Pooled keep-alive connections for the Bedrock runtime clients, so turns
+# reuse warm TLS connections instead of handshaking again
+BEDROCK_CLIENT_CONFIG = Config(
+    max_pool_connections=32,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+    tcp_keepalive=True,
+)
+
+# Bedrock serves latency-optimized inference only for these cross-region
+# profiles in us-east-2 - set TEACHASSIST_LATENCY_OPTIMIZED=1 to request it there
+LATENCY_OPTIMIZED_MODELS = frozenset({
+    "us.amazon.nova-pro-v1:0",
+    "us.anthropic.claude-3-5-haiku-20241022-v1:0",
+})
+LATENCY_OPTIMIZED_REGION = "us-east-2"
+
+# Static parts of the knowledge base prompts, filled in once per query
+KB_PROMPT_TEMPLATE = 'User question: "{query}"\n\nInformation from knowledge base:\n{records}'
+ANSWER_PROMPT_SUFFIX = "\n\nStart your answer with newline character and provide a helpful answer based on this information:"
+
+# Words the classifiers reply with
+AGENT_CHOICES = ("teacher", "knowledgebase")
+KB_ACTION_CHOICES = ("store", "retrieve")
+
+# Labels of the teacher's specialist tools, as shown in the sidebar
+TEACHER_TOOL_LABELS = (
+    "Math Assistant",
+    "Language Assistant",
+    "English Assistant",
+    "Computer Science Assistant",
+    "General Assistant",
+)
+
+def init_session_state():
+    """Create the per-session chat history, caches and pending write queue."""
+    # Initialize session state for conversation history
+    if "messages" not in st.session_state:
+        st.session_state.messages = []
+
+    # Initialize the per-session cache of LLM responses
+    if "llm_cache" not in st.session_state:
+        st.session_state.llm_cache = {}
+
+    # Initialize the per-session cache of recently retrieved results
+    if "retrieve_cache" not in st.session_state:
+        st.session_state.retrieve_cache = {}
+
+    # Initialize the queue of knowledge base writes still running in the background
+    if "pending_stores" not in st.session_state:
+        st.session_state.pending_stores = deque()
+
+    # Initialize this session's agents
+    if "agents" not in st.session_state:
+        st.session_state.agents = {}
+
+def render_history():
+    """Display the conversation history."""
+    for message in st.session_state.messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+    st.session_state.rendered_count = len(st.session_state.messages)
+
+def render_new_messages():
+    """Display messages added by earlier runs of the chat fragment, which the
+    page-level history has not rendered."""
+    for message in st.session_state.messages[st.session_state.rendered_count:]:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+
+def session_resource(factory):
+    """Cache factory's result in the current session, building it again when its arguments change."""
+    @functools.wraps(factory)
+    def wrapper(*args):
+        agents = st.session_state.agents
+        if factory.__name__ not in agents or agents[factory.__name__][0] != args:
+            agents[factory.__name__] = (args, factory(*args))
+        return agents[factory.__name__][1]
+    return wrapper
+
+# Share one boto3 session (and its resolved credentials) across all Bedrock models
+@st.cache_resource
+def get_boto_session():
+    return boto3.Session()
+
+def latency_optimized_args(model_id):
+    """Return the Converse performanceConfig requesting latency-optimized inference, or None where it is unavailable."""
+    if (
+        os.environ.get("TEACHASSIST_LATENCY_OPTIMIZED")
+        and model_id in LATENCY_OPTIMIZED_MODELS
+        and get_boto_session().region_name == LATENCY_OPTIMIZED_REGION
+    ):
+        return {"performanceConfig": {"latency": "optimized"}}
+    return None
+
+# Initialize a Bedrock model, shared by every agent using the same model and temperature
+@st.cache_resource
+def get_bedrock_model(model_id: str, temperature: float):
+    # Specify the Bedrock ModelID
+    return BedrockModel(
+        model_id=model_id,
+        temperature=temperature,
+        additional_args=latency_optimized_args(model_id),
+        boto_session=get_boto_session(),
+        boto_client_config=BEDROCK_CLIENT_CONFIG,
+    )
+
+# Initialize this session's teacher agent, rebuilt when the model or enabled tools change
+@session_resource
+def get_teacher_agent(model_id: str, enabled: frozenset):
+    # Import the specialized assistants on first use so the page renders without waiting on them
+    from strands_multi_agent_example.computer_science_assistant import computer_science_assistant
+    from strands_multi_agent_example.english_assistant import english_assistant
+    from strands_multi_agent_example.language_assistant import language_assistant
+    from strands_multi_agent_example.math_assistant import math_assistant
+    from strands_multi_agent_example.no_expertise import general_assistant
+
+    teacher_tools = {
+        "Math Assistant": math_assistant,
+        "Language Assistant": language_assistant,
+        "English Assistant": english_assistant,
+        "Computer Science Assistant": computer_science_assistant,
+        "General Assistant": general_assistant,
+    }
+
+    # Select tools based on user toggles, defaulting to the general assistant
+    tools = [tool for label, tool in teacher_tools.items() if label in enabled]
+    if not tools:
+        tools = [general_assistant]
+
+    # Create the teacher agent with specialized tools
+    return Agent(
+        model=get_bedrock_model(model_id, temperature=0.3),
+        system_prompt=TEACHER_SYSTEM_PROMPT,
+        callback_handler=None,
+        tool_executor=ConcurrentToolExecutor(),  # Run independent specialist calls in parallel
+        tools=tools,
+    )
+
+# Initialize this session's knowledge base agent, rebuilt when the model changes
+@session_resource
+def get_kb_agent(model_id: str):
+    # Create the knowledge base agent with memory tools
+    return Agent(
+        model=get_bedrock_model(model_id, temperature=0.3),
+        tools=[memory],
+        record_direct_tool_call=False,  # Tools are only called directly; don't grow its history
+    )
+
+# Share one Bedrock knowledge base retrieval client across all sessions
+@st.cache_resource
+def get_kb_client():
+    # Same region as the memory tool that stores the records
+    return get_boto_session().client(
+        "bedrock-agent-runtime",
+        region_name=os.environ.get("AWS_REGION", "us-west-2"),
+        config=BEDROCK_CLIENT_CONFIG,
+    )
+
+# Initialize the classifier model, cached per model
+@st.cache_resource
+def get_classifier_model(model_id: str):
+    # One-word classifier replies need neither sampling nor more than a few tokens
+    return BedrockModel(
+        model_id=model_id,
+        temperature=0,
+        max_tokens=4,
+        additional_args=latency_optimized_args(model_id),
+        boto_session=get_boto_session(),
+        boto_client_config=BEDROCK_CLIENT_CONFIG,
+    )
+
+async def open_stream(model):
+    """Start a tiny streamed request on the model and stop at its first event."""
+    async for _ in model.stream([{"role": "user", "content": [{"text": "hi"}]}]):
+        break
+
+def warm_up(model):
+    """Open the model's pooled Bedrock connection with a tiny request."""
+    try:
+        asyncio.run(open_stream(model))
+    except Exception:
+        pass  # Best effort - real requests report their own errors
+
+# Warm up the classifier and synthesis models in the background, once per process
+@st.cache_resource
+def warm_up_models(model_id: str, classifier_model_id: str):
+    threads = [
+        threading.Thread(target=warm_up, args=(model,), daemon=True)
+        for model in (get_classifier_model(classifier_model_id), get_bedrock_model(model_id, temperature=0.3))
+    ]
+    for thread in threads:
+        thread.start()
+    return threads
+
+# Knowledge base writes run in the background so the UI can answer immediately
+@st.cache_resource
+def get_store_executor():
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="kb-store")
+
+class DeferredPlaceholder:
+    """Buffers markdown updates until a real Streamlit placeholder is attached."""
+
+    def __init__(self):
+        self.target = None
+        self.body = None
+
+    def markdown(self, body):
+        self.body = body
+        if self.target is not None:
+            self.target.markdown(body)
+
+    def attach(self, target):
+        self.target = target
+        if self.body is not None:
+            target.markdown(self.body)
+
+async def stream_response(agent, prompt, placeholder, **kwargs):
+    """Stream an agent's reply into a Streamlit placeholder and return the full text."""
+    content = ""
+    async for event in agent.stream_async(prompt, **kwargs):
+        if "data" in event:
+            content += event["data"]
+            placeholder.markdown(content + "▌")
+    placeholder.markdown(content)
+    return content
+
+def llm_cache_key(model, system_prompt, prompt):
+    """Digest identifying an LLM call by model, system prompt and user prompt."""
+    model_id = model.get_config()["model_id"]
+    return hashlib.blake2b("\0".join((model_id, system_prompt, prompt)).encode(), digest_size=16).digest()
+
+def remember_llm_response(key, response):
+    """Store a response in the session cache, evicting the oldest entry when full."""
+    cache = st.session_state.llm_cache
+    if len(cache) >= LLM_CACHE_SIZE:
+        cache.pop(next(iter(cache)))
+    cache[key] = response
+
+def tool_text(result):
+    """Return the text content of a direct tool call result."""
+    return "".join(block.get("text", "") for block in result.get("content", []))
+
+async def cached_invoke(model, system_prompt, prompt):
+    """Run a prompt on the model and return the reply text, reusing the reply to an identical earlier call."""
+    key = llm_cache_key(model, system_prompt, prompt)
+    if key in st.session_state.llm_cache:
+        return st.session_state.llm_cache[key]
+
+    # A dedicated agent without tools, so the call runs on exactly this model and its settings
+    agent = Agent(model=model, system_prompt=system_prompt, callback_handler=None)
+    reply = str(await agent.invoke_async(prompt))
+    remember_llm_response(key, reply)
+    return reply
+
+async def classify(model, system_prompt, prompt, choices):
+    """Ask the classifier model for a one-word reply and return the choice it names, or None."""
+    reply = await cached_invoke(model, system_prompt, prompt)
+    match = re.search(r"\b(" + "|".join(choices) + r")\b", reply.lower())
+    return match.group(1) if match else None
+
+def retrieve_from_kb(query):
+    """Return the knowledge base's retrieval results for the query, best matches first."""
+    kb_id = os.environ.get("STRANDS_KNOWLEDGE_BASE_ID")
+    if not kb_id:
+        raise ValueError("STRANDS_KNOWLEDGE_BASE_ID environment variable is not set")
+
+    response = get_kb_client().retrieve(
+        knowledgeBaseId=kb_id,
+        retrievalQuery={"text": query},
+        retrievalConfiguration={"vectorSearchConfiguration": {"numberOfResults": KB_MAX_RESULTS}},
+    )
+    return response["retrievalResults"]
+
+def format_kb_results(results, min_score, max_results):
+    """Render the best knowledge base retrieval results as a compact list of content and scores."""
+    results = [result for result in results if result.get("score", 0) >= min_score]
+    results.sort(key=lambda result: result["score"], reverse=True)
+    return "\n".join(
+        f"- {result['content']['text']} (score={result['score']:.2f})"
+        for result in results[:max_results]
+    )
+
+async def determine_action(query, classifier_model):
+    """Ask the LLM whether an ambiguous query belongs to the teacher agent or knowledge base agent."""
+    action = await classify(classifier_model, ACTION_SYSTEM_PROMPT, query, AGENT_CHOICES)
+
+    # Default to the knowledge base agent if the reply names neither
+    return action or "knowledgebase"
+
+async def classify_and_answer(model, kb_prompt):
+    """Classify an ambiguous query and answer it in a single LLM call, or return None if the reply is not valid JSON."""
+    text = await cached_invoke(model, KB_COMBINED_SYSTEM_PROMPT, kb_prompt)
+    try:
+        decision = json.loads(text[text.index("{"):text.rindex("}") + 1])
+    except ValueError:
+        return None
+    if decision.get("action") == "store" or (decision.get("action") == "retrieve" and "answer" in decision):
+        return decision
+    return None
+
+async def cached_retrieve(key, retrieve):
+    """Await retrieve(), reusing its result for the same key from the last RETRIEVE_CACHE_TTL seconds."""
+    cache = st.session_state.retrieve_cache
+    now = time.monotonic()
+    if key in cache and now - cache[key][0] < RETRIEVE_CACHE_TTL:
+        return cache[key][1]
+
+    result = await retrieve()
+    # Failed tool calls are retried on the next query rather than cached
+    if not (isinstance(result, dict) and result.get("status") == "error"):
+        # Drop expired entries so the cache only holds recent queries
+        for stale in [k for k, (stored_at, _) in cache.items() if now - stored_at >= RETRIEVE_CACHE_TTL]:
+            del cache[stale]
+        cache[key] = (now, result)
+    return result
+
+def store_in_kb(agent, query):
+    """Store the full query in the knowledge base in the background."""
+    future = get_store_executor().submit(agent.tool.memory, action="store", content=query)
+    st.session_state.pending_stores.append(future)
+    st.session_state.retrieve_cache.clear()
+    return "I've stored this information."
+
+def report_finished_stores():
+    """Show a toast for each background knowledge base write that failed since the last rerun."""
+    pending = st.session_state.pending_stores
+    for _ in range(len(pending)):
+        future = pending.popleft()
+        if not future.done():
+            pending.append(future)
+            continue
+
+        # Results retrieved while the write was running may be stale
+        st.session_state.retrieve_cache.clear()
+        if future.exception() is not None:
+            st.toast(f"Couldn't store information: {future.exception()}")
+        elif future.result().get("status") == "error":
+            st.toast(f"Couldn't store information: {tool_text(future.result())}")
+
+async def synthesize_answer(model, kb_prompt, placeholder):
+    """Stream a conversational answer to a question over retrieved information into placeholder."""
+    answer_prompt = kb_prompt + ANSWER_PROMPT_SUFFIX
+
+    # The same question over the same retrieved information gets the same answer
+    key = llm_cache_key(model, ANSWER_SYSTEM_PROMPT, answer_prompt)
+    if key in st.session_state.llm_cache:
+        return st.session_state.llm_cache[key]
+
+    # Generate a clear, conversational answer using the retrieved information,
+    # streaming it into the UI as it is generated
+    answer_agent = Agent(
+        model=model,
+        system_prompt=ANSWER_SYSTEM_PROMPT,
+        callback_handler=None,
+    )
+    answer = await stream_response(answer_agent, answer_prompt, placeholder)
+    remember_llm_response(key, answer)
+    return answer
+
+async def run_kb_agent(query, placeholder, agent, classifier_model):
+    """Process a user query with the knowledge base agent, streaming answers into placeholder."""
+    # Determine the action - store or retrieve - from keywords where possible
+    action = route_kb_action(query)
+    if action == "store":
+        return store_in_kb(agent, query)
+
+    # Query the knowledge base with appropriate parameters, reusing a
+    # recent result for a repeated query
+    results = await cached_retrieve(
+        ("kb", query.strip().lower()),
+        lambda: asyncio.to_thread(retrieve_from_kb, query),
+    )
+    # Keep only the content text and scores of the best records for the synthesis prompt
+    kb_prompt = KB_PROMPT_TEMPLATE.format(
+        query=query,
+        records=format_kb_results(results, KB_MIN_SCORE, KB_MAX_RESULTS),
+    )
+
+    if action is None:
+        # Ambiguous query - classify and answer it in one LLM call instead of two
+        decision = await classify_and_answer(agent.model, kb_prompt)
+        if decision is not None:
+            if decision["action"] == "store":
+                return store_in_kb(agent, query)
+            placeholder.markdown(decision["answer"])
+            return decision["answer"]
+
+        # Unusable reply - fall back to the dedicated classifier
+        kb_action = await classify(classifier_model, KB_ACTION_SYSTEM_PROMPT, query, KB_ACTION_CHOICES)
+
+        # Default to retrieve if response isn't clear
+        if kb_action == "store":
+            return store_in_kb(agent, query)
+
+    return await synthesize_answer(agent.model, kb_prompt, placeholder)
+
+async def answer_query(query, placeholder, teacher_agent, kb_agent, classifier_model):
+    """Route a query and stream the answer from the selected agent."""
+    # Confident keyword routes need neither the LLM classifier nor speculation
+    action = route_query(query)
+    if action == "knowledgebase":
+        return await run_kb_agent(query, placeholder, kb_agent, classifier_model)
+
+    if action == "teacher":
+        return await stream_response(teacher_agent, query, placeholder)
+
+    history_length = len(teacher_agent.messages)
+    teacher_placeholder = DeferredPlaceholder()
+
+    # Ambiguous query - most are educational, so start the teacher agent
+    # while the LLM classifier decides
+    classify_task = asyncio.create_task(determine_action(query, classifier_model))
+    teacher_task = asyncio.create_task(stream_response(teacher_agent, query, teacher_placeholder))
+
+    action = None
+    try:
+        action = await classify_task
+    finally:
+        if action != "teacher":
+            # Wrong guess - drop the speculative teacher turn from its conversation history
+            teacher_task.cancel()
+            await asyncio.gather(teacher_task, return_exceptions=True)
+            del teacher_agent.messages[history_length:]
+
+    if action == "teacher":
+        # Show what the teacher has produced so far and keep streaming from there
+        teacher_placeholder.attach(placeholder)
+        return await teacher_task
+
+    return await run_kb_agent(query, placeholder, kb_agent, classifier_model)